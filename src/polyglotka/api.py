@@ -0,0 +1,57 @@
+"""Query words from notebooks and scripts without going through the CLI.
+
+    from polyglotka import api
+
+    api.query(lang='ja', stage='known', since='2025-09-01')
+    api.query(contains='haus', arrow=True)
+
+Queries read the cached words only. Importing exported files is up to `polyglotka import`
+or `load_index(import_new=True)`.
+"""
+
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer import words_cache
+from polyglotka.importer.words import import_words
+from polyglotka.importer.words_index import WordIndex
+
+_index: WordIndex | None = None
+_index_mtime: float | None = None
+
+
+def load_index(refresh: bool = False, import_new: bool = False) -> WordIndex:
+    """Read the cache once per process, then again only when another run updates it.
+
+    With `import_new`, exported files (and Chrome, if CHROME is set) are imported first, like the CLI does.
+    """
+    global _index, _index_mtime
+
+    if import_new:
+        with config.restored_after():
+            vars(config)['CACHE_TTL'] = 0  # New files are the point, however fresh the cache
+            _index = WordIndex(import_words())
+    elif _index is None or refresh or words_cache.mtime() != _index_mtime:
+        if not words_cache.exists():
+            raise UserError('Cached words are not found. Run "polyglotka import" first.')
+        _index = WordIndex(words_cache.read())
+    _index_mtime = words_cache.mtime()
+    return _index
+
+
+def query(
+    lang: str = '',
+    stage: str = '',
+    since: datetime | str | None = None,
+    until: datetime | str | None = None,
+    contains: str = '',
+    arrow: bool = False,
+) -> pd.DataFrame | Any:
+    """Words matching all filters, sorted by date. Returns a pyarrow Table if `arrow` is set."""
+    index = load_index()
+    rows = index.rows(lang=lang, stage=stage, since=since, until=until, contains=contains)
+    return index.to_arrow(rows) if arrow else index.to_frame(rows)
@@ -0,0 +1,62 @@
+"""The `polyglotka` executable: ask a running `polyglotka serve`, or run the command in this process.
+
+Keep the imports light, they are the whole point of asking the server.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any
+
+from platformdirs import user_cache_dir
+
+APP_NAME = 'polyglotka'
+ENV_PREFIX = f'{APP_NAME.upper()}_'
+SERVED_COMMANDS = ('words', 'kanji', 'anki', 'info')
+CONNECT_TIMEOUT_SECONDS = 0.2
+
+
+def server_socket() -> str:
+    return os.environ.get(f'{ENV_PREFIX}SERVER_SOCKET') or os.path.join(
+        user_cache_dir(APP_NAME), 'server.sock'
+    )
+
+
+def app_env() -> dict[str, str]:
+    """The server answers only if it was started with the same variables."""
+    return {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+
+
+def ask_server(argv: list[str]) -> dict[str, Any] | None:
+    """The server's response, None if no server is running or it can't answer this one."""
+    if not argv or argv[0] not in SERVED_COMMANDS or not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    request = dict(argv=argv, cwd=os.getcwd(), env=app_env())
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+            sock.connect(server_socket())
+            sock.settimeout(None)  # Commands take as long as they take
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as reader:
+                response = json.loads(reader.readline() or 'null')
+    except (OSError, ValueError):
+        return None
+    return response if response and response['status'] == 'ok' else None
+
+
+def main() -> None:
+    if (response := ask_server(sys.argv[1:])) is None:
+        from polyglotka.main import main as main_in_process
+
+        return main_in_process()
+
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['exit_code'])
+
+
+if __name__ == '__main__':
+    main()
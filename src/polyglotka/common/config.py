@@ -1,5 +1,6 @@
+from contextlib import contextmanager
 from functools import cached_property
-from typing import Any
+from typing import Any, Iterator
 
 from path import Path
 from platformdirs import user_cache_dir
@@ -22,12 +23,30 @@ class _Config(BaseSettings):  # Singleton
     START: int = 1
     STAGE: str = ''
     LANG: str = ''
+    QUERY: str = ''  # Words starting with, containing, or resembling it
+    QUERY_LIMIT: int = 50
 
     CACHE_DIR: Path = Path(user_cache_dir(APP_NAME)).mkdir_p()
-    CACHE_WORDS: Path = CACHE_DIR / 'words.json'
+    CACHE_WORDS: Path = CACHE_DIR / 'words'  # A file per language and a manifest
+    CACHE_ROLLUPS: Path = CACHE_DIR / 'rollups.json'
+    CACHE_LEMMAS: Path = CACHE_DIR / 'lemmas.npz'
+    CACHE_QUARANTINE: Path = CACHE_DIR / 'quarantine.jsonl'
+    CACHE_MEDIA: Path = CACHE_DIR / 'media'
+    CACHE_LOCK: Path = CACHE_DIR / 'cache.lock'
+    CACHE_SNAPSHOTS: Path = CACHE_DIR / 'snapshots'
+    CACHE_LR_VERSIONS: Path = CACHE_DIR / 'lr_versions.json'  # LR items in the cache, to skip them next time
+    CACHE_REFRESHED: Path = CACHE_DIR / 'refreshed'  # Touched whenever an import checks for new words
+    CACHE_REFRESHING: Path = CACHE_DIR / 'refreshing'  # Touched when a background import starts
+    CACHE_REFRESH_LOG: Path = CACHE_DIR / 'refresh.log'  # Output of the last background import
+    # Seconds read-only commands use the cache without importing, 0 to import every time
+    CACHE_TTL: int = 3600
+    CACHE_REFRESH_IN_BACKGROUND: bool = True  # Refresh a stale cache in the background, or before the command
+    SERVER_SOCKET: Path = CACHE_DIR / 'server.sock'  # Unix socket of `polyglotka serve`
+    SNAPSHOTS_KEEP: int = 30  # Snapshots of the words kept for `diff`, 0 to stop saving them
 
     EXPORTED_FILES_DIR: str = Path.home() / 'Downloads'
     LR_FILES_GLOB_PATTERN: str = 'lln_json_items_*.json'
+    LR_MEDIA: bool = False  # Extract audio and thumbnails from LR files into CACHE_MEDIA
     MGK_FILES_GLOB_PATTERN: str = 'migaku_words_*.csv'
 
     LR_SUBS_GLOB_PATTERN: str = 'lln_excel_subs_*.xlsx'
@@ -38,23 +57,48 @@ class _Config(BaseSettings):  # Singleton
     PLOTS_TITLE: str = 'Polyglotka Plots'
     PLOTS_BACKGROUND_COLOR: str = '#171717'
     PLOTS_SERVER_URL: str = 'http://127.0.0.1:8050'
+    PLOTS_SERVER_THREADS: int = 4
+    PLOTS_SERVER_KEEP_ALIVE: bool = False  # Keep serving after the browser opens the plots
     PLOTS_SMOOTH: bool = True
     PLOTS_AGGREGATE: bool = True
     PLOTS_LEARNING_STAGES: str = 'LEARNING,KNOWN,SKIPPED'
     PLOTS_Y_MIN: int = 0
     PLOTS_X_DAYS_DELTA: int | None = None
     PLOTS_Y_TITLE: str = 'Word Count'
+    PLOTS_PAGE_SIZE: int = 50  # Words per page of the drill-down table, needs PLOTS_SERVER_KEEP_ALIVE
 
     ANKI_MIN_COUNTS: tuple[int, int] | str = (0, 0)
     ANKI_FILTERS: str = 'deck:漢字 is:suspended'
     ANKI_KANJI_FIELD: str = 'kanji'
+    ANKI_COLLECTION: str = ''  # Path to collection.anki2, update it directly instead of printing a query
+    ANKI_TAG: str = 'polyglotka'  # Tag for matching notes, empty to skip tagging
+    ANKI_UNSUSPEND: bool = True  # Unsuspend cards of matching notes
+
+    STATS_DAYS: int = 30
+    LEMMAS_TOP: int = 100
+    DIFF_FROM: str | int = -2  # Snapshot index or id prefix, see `diff`
+    DIFF_TO: str | int = -1
+    COVERAGE_RANKS: tuple[int, ...] | str = '1000,2000,5000,10000'
+    COVERAGE_PLOT: bool = False
 
     KNOWN_MORPHS_DIR: str = EXPORTED_FILES_DIR
     KNOWN_MORPHS_SAVE_LANGS: str = ''  # Example: 'ja,de'
 
+    EXPORT_DIR: str = EXPORTED_FILES_DIR
+    EXPORT_FORMAT: str = 'parquet'  # Or 'arrow' for Arrow IPC files, needs the "arrow" extra
+    APKG_DECK: str = 'Polyglotka'  # Parent deck of `apkg`, with a subdeck per language
+
+    BATCH_DIR: str = ''  # One subdirectory with exported files per learner
+    BATCH_WORKERS: int = 0  # Number of worker processes, 0 means one per CPU
+
     CHROME_DATA_DIR: str = ''  # Auto-detect if empty
     CHROME: bool = True  # Use --chrome flag to import directly from Chrome's IndexedDB
 
+    OUTPUT: str = ''  # File for the printed output instead of stdout
+    PROFILE: bool = False  # Use --profile flag to print stage timings and peak memory
+    PROFILE_DUMP_DIR: str = ''  # Also dump cProfile and tracemalloc stats here if set
+    METRICS_FILE: str = ''  # Write Prometheus metrics of every run to this file, e.g. polyglotka.prom
+
     @cached_property
     def plots_learning_stages(self):
         from polyglotka.importer.words import LearningStage
@@ -66,6 +110,18 @@ class _Config(BaseSettings):  # Singleton
         assert isinstance(self.ANKI_MIN_COUNTS, tuple)
         return self.ANKI_MIN_COUNTS
 
+    @property
+    def coverage_ranks(self) -> list[int]:
+        ranks = self.COVERAGE_RANKS
+        try:
+            parsed = sorted(map(int, ranks if isinstance(ranks, tuple) else str(ranks).split(',')))
+            assert parsed and parsed[0] > 0
+            return parsed
+        except (ValueError, AssertionError):
+            raise UserError(
+                f'COVERAGE_RANKS must be positive integers separated by commas, not this: {ranks}'
+            )
+
     @staticmethod
     def validate_anki_min_counts(min_counts_arg: str | tuple[Any, ...]) -> tuple[int, int]:
         try:
@@ -84,6 +140,41 @@ class _Config(BaseSettings):  # Singleton
     def _(cls, value: Any) -> tuple[int, int]:
         return cls.validate_anki_min_counts(value)
 
+    @property
+    def cache_paths(self) -> dict[str, Path]:
+        return {
+            name: value
+            for name, value in self.model_dump().items()
+            if name.startswith('CACHE_') and name != 'CACHE_DIR' and isinstance(value, Path)
+        }
+
+    def check_cache_paths_movable(self) -> None:
+        """Cache files overridden to live elsewhere would be shared by every cache dir, e.g. by learners."""
+        for name, value in self.cache_paths.items():
+            if value.relpath(self.CACHE_DIR).startswith('..'):
+                raise UserError(
+                    f'{name} must be inside CACHE_DIR "{self.CACHE_DIR}" to move with it, not here: {value}'
+                )
+
+    def use_cache_dir(self, cache_dir: str) -> None:
+        """Move every cache file under another directory, e.g. one per learner."""
+        self.check_cache_paths_movable()
+        cache_dir = Path(cache_dir).makedirs_p()
+        for name, value in self.cache_paths.items():
+            vars(self)[name] = cache_dir / value.relpath(self.CACHE_DIR)
+        vars(self)['CACHE_DIR'] = cache_dir
+
+    @contextmanager
+    def restored_after(self) -> Iterator[None]:
+        """Undo the overrides made inside, e.g. by one command of `run` or of the server."""
+        defaults = dict(vars(self))
+        try:
+            yield
+        finally:
+            for name in set(vars(self)) - set(defaults):
+                del vars(self)[name]
+            vars(self).update(defaults)
+
     def override(self, config_upd: dict[str, Any]) -> None:
         config_upd = {k.upper(): v for k, v in config_upd.items()}
         if extra_vars := set(config_upd.keys()) - set(self.model_dump().keys()):
@@ -92,7 +183,12 @@ class _Config(BaseSettings):  # Singleton
         vars(self).update(config_upd)
 
         self.validate_anki_min_counts(self.ANKI_MIN_COUNTS)
-        for directory in (self.EXPORTED_FILES_DIR, self.SRT_SUBS_TARGET_DIR, self.KNOWN_MORPHS_DIR):
+        for directory in (
+            self.EXPORTED_FILES_DIR,
+            self.SRT_SUBS_TARGET_DIR,
+            self.KNOWN_MORPHS_DIR,
+            self.EXPORT_DIR,
+        ):
             if not Path(directory).is_dir():
                 raise UserError(f'Directory not found: {directory}')
 
@@ -1,10 +1,13 @@
 import sys
+import threading
+from contextlib import contextmanager
 from enum import StrEnum, auto
 from types import TracebackType
-from typing import Any, Optional, Self, Type
+from typing import Any, Iterator, Optional, Self, TextIO, Type
 
 from pydantic import BaseModel, ConfigDict
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.progress import BarColumn
 from rich.progress import Progress as RichProgress
 from rich.progress import SpinnerColumn, TextColumn
@@ -12,6 +15,11 @@ from rich.progress import SpinnerColumn, TextColumn
 _console = Console(file=sys.stderr, force_terminal=True)  # Singleton
 COLOR = 'bright_magenta'
 
+# Rich allows one live display at a time, so concurrent progress bars share it
+_live: Live | None = None
+_live_progresses: list[RichProgress] = []
+_live_lock = threading.Lock()
+
 
 class ProgressType(StrEnum):
     BAR = auto()
@@ -22,6 +30,45 @@ def pprint(*args: Any) -> None:
     _console.print(*args, style=COLOR)
 
 
+@contextmanager
+def redirected(file: TextIO) -> Iterator[None]:
+    """Print messages and progress bars to another file meanwhile, e.g. the captured stderr of a request."""
+    original = _console.file
+    _console.file = file
+    try:
+        yield
+    finally:
+        _console.file = original
+
+
+def mute() -> None:
+    """Silence messages and progress bars, e.g. in worker processes."""
+    _console.quiet = True
+
+
+def _show(rich_progress: RichProgress) -> None:
+    global _live
+    with _live_lock:
+        _live_progresses.append(rich_progress)
+        if _live is None:
+            _live = Live(
+                get_renderable=lambda: Group(*_live_progresses), console=_console, refresh_per_second=10
+            )
+            _live.start()
+
+
+def _hide(rich_progress: RichProgress) -> None:
+    global _live
+    with _live_lock:
+        assert _live is not None
+        if _live_progresses == [rich_progress]:
+            _live.stop()  # The last render stays on screen
+            _live = None
+        else:
+            _live.console.print(rich_progress)  # Finished bars stay on screen above the running ones
+        _live_progresses.remove(rich_progress)
+
+
 class Progress(BaseModel):
     model_config = ConfigDict(extra='allow')
 
@@ -54,8 +101,8 @@ class Progress(BaseModel):
             case _:
                 self.rich_progress = RichProgress()
 
-        self.rich_progress.__enter__()
         self.task = self.rich_progress.add_task(self.text, total=self.total_tasks)
+        _show(self.rich_progress)
         return self
 
     def __exit__(
@@ -64,7 +111,7 @@ class Progress(BaseModel):
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
-        self.rich_progress.__exit__(exc_type, exc_val, exc_tb)
+        _hide(self.rich_progress)
 
     def update(self, text: str = '', advance: int = 0) -> None:
         self.rich_progress.update(self.task, advance=advance)
@@ -0,0 +1,160 @@
+"""Metrics of the last run as a Prometheus textfile, e.g. for node_exporter's textfile collector.
+
+Values are added per file, batch or stage, never per item, and only while a run is collected,
+so leaving METRICS_FILE set costs nothing measurable.
+"""
+
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.utils import write_text_atomic
+
+Labels = tuple[tuple[str, str], ...]
+
+METRICS: dict[str, str] = {  # Name -> help, all gauges of the last run
+    'run_success': 'Whether the last run of the command succeeded',
+    'run_timestamp_seconds': 'Unix time of the last run of the command',
+    'run_seconds': 'Duration of the last run of the command',
+    'stage_seconds': 'Time spent in each stage, summed over threads and calls',
+    'items': 'Items produced by each source',
+    'parse_failures': 'Items of each source that failed validation',
+    'read_bytes': 'Bytes read from the files of each source',
+    'cached_words': 'Cached words by language and stage',
+    'cache_bytes': 'Size of each cache file or directory',
+    'peak_rss_bytes': 'Peak resident memory of the process',
+}
+
+
+class _Run:
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.values: defaultdict[str, dict[Labels, float]] = defaultdict(dict)
+
+
+_run: _Run | None = None
+_lock = threading.Lock()  # Sources add from their own threads
+
+
+def collecting() -> bool:
+    return _run is not None
+
+
+def _key(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def add(name: str, value: float = 1, **labels: str) -> None:
+    if (run := _run) is None:
+        return
+    with _lock:
+        series = run.values[name]
+        series[_key(labels)] = series.get(_key(labels), 0) + value
+
+
+def set_value(name: str, value: float, **labels: str) -> None:
+    if (run := _run) is None:
+        return
+    with _lock:
+        run.values[name][_key(labels)] = value
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    if _run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add('stage_seconds', time.perf_counter() - start, stage=name)
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Kilobytes on Linux
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(file.getsize() for file in path.walkfiles())
+    return path.getsize() if path.exists() else 0
+
+
+def _set_state_values() -> None:
+    from polyglotka.importer import words_cache
+
+    for path in config.cache_paths.values():
+        set_value('cache_bytes', _size(path), path=path.relpath(config.CACHE_DIR))
+    if manifest := words_cache.read_manifest():
+        for lang, partition in manifest.partitions.items():
+            for stage_name, count in partition.stages.items():
+                set_value('cached_words', count, language=lang, stage=stage_name)
+    if (peak_rss := _peak_rss_bytes()) is not None:
+        set_value('peak_rss_bytes', peak_rss)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def render(run: _Run) -> str:
+    lines: list[str] = []
+    for name, help_text in METRICS.items():
+        if not (series := run.values.get(name)):
+            continue
+        full_name = f'{config.APP_NAME}_{name}'
+        lines += [f'# HELP {full_name} {help_text}.', f'# TYPE {full_name} gauge']
+        for labels, value in sorted(series.items()):
+            label_text = ','.join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+            series_name = f'{full_name}{{{label_text}}}' if labels else full_name
+            lines.append(f'{series_name} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def save(success: bool = True) -> None:
+    """Write the metrics collected so far. Long-running commands call it before they block."""
+    if (run := _run) is None:
+        return
+    set_value('run_success', int(success), command=run.command)
+    set_value('run_timestamp_seconds', run.timestamp, command=run.command)
+    set_value('run_seconds', time.perf_counter() - run.start, command=run.command)
+    _set_state_values()
+    with _lock:  # `plots` saves while its figure is built
+        text = render(run)
+    write_text_atomic(config.METRICS_FILE, text)
+
+
+@contextmanager
+def collect(command: str) -> Iterator[None]:
+    """Collect a run and save its metrics at the end, if METRICS_FILE is set."""
+    global _run
+    if not config.METRICS_FILE:
+        yield
+        return
+
+    outer, _run = _run, _Run(command)  # Commands answered by `serve` are runs of their own
+    success = False
+    try:
+        yield
+        success = True
+    finally:
+        save(success)
+        _run = outer
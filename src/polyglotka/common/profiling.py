@@ -0,0 +1,176 @@
+"""Nested stage timings and peak memory for `--profile` runs."""
+
+import cProfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, TypeVar
+
+from path import Path
+from rich.tree import Tree
+
+from polyglotka.common import metrics
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+
+T = TypeVar('T')
+
+TRACEMALLOC_TOP_STATS = 30
+_children_lock = threading.Lock()  # Sources import in threads under one parent span
+
+
+@dataclass
+class Span:
+    name: str
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    calls: int = 0
+    children: list['Span'] = field(default_factory=list)
+
+    def child(self, name: str) -> 'Span':
+        # Same-named stages under one parent are merged, e.g. one span per file
+        with _children_lock:
+            for span in self.children:
+                if span.name == name:
+                    return span
+            self.children.append(span := Span(name))
+            return span
+
+
+_current_span: ContextVar[Span | None] = ContextVar('current_span', default=None)
+_root_span: Span | None = None
+_profiler: cProfile.Profile | None = None
+
+
+def _record_peak(span: Span) -> None:
+    span.peak_bytes = max(span.peak_bytes, tracemalloc.get_traced_memory()[1])
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a pipeline stage. A no-op unless the run is profiled.
+
+    Works as a decorator too. Don't keep it open across a `yield`:
+    context vars leak from generators into their consumers.
+    Stage timings go to the metrics too, if they are collected.
+    """
+    with metrics.stage(name):
+        parent = _current_span.get()
+        if parent is None:
+            yield
+            return
+
+        current = parent.child(name)
+        _record_peak(parent)
+        tracemalloc.reset_peak()
+        token = _current_span.set(current)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current.seconds += time.perf_counter() - start
+            current.calls += 1
+            _record_peak(current)
+            parent.peak_bytes = max(parent.peak_bytes, current.peak_bytes)
+            _current_span.reset(token)
+
+
+def iterate(name: str, items: Iterable[T]) -> Iterator[T]:
+    """Yield the items lazily, timing only their production as one stage, not what the consumer does.
+
+    Nothing is timed unless the run is profiled or its metrics are collected.
+    """
+    parent = _current_span.get()
+    if parent is None and not metrics.collecting():
+        yield from items
+        return
+
+    iterator = iter(items)
+    seconds = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                seconds += time.perf_counter() - start
+            yield item
+    finally:
+        metrics.add('stage_seconds', seconds, stage=name)
+        if parent is not None:
+            current = parent.child(name)
+            current.seconds += seconds
+            current.calls += 1
+            _record_peak(current)
+            parent.peak_bytes = max(parent.peak_bytes, current.peak_bytes)
+
+
+def _format_span(span: Span) -> str:
+    calls = f'  x{span.calls}' if span.calls > 1 else ''
+    return f'{span.name}  [bold]{span.seconds:.3f}s[/bold]  peak {span.peak_bytes / 2**20:.1f} MB{calls}'
+
+
+def _build_tree(span: Span, tree: Tree) -> Tree:
+    for child in span.children:
+        _build_tree(child, tree.add(_format_span(child)))
+    return tree
+
+
+def _dump(root: Span) -> None:
+    dump_dir = Path(config.PROFILE_DUMP_DIR).mkdir_p()
+    stem = f'{config.APP_NAME}_{root.name}'
+
+    if _profiler is not None:
+        prof_file = dump_dir / f'{stem}.prof'
+        _profiler.dump_stats(prof_file)
+        pprint(f'Saved cProfile stats: "{prof_file}".')
+
+    tracemalloc_file = dump_dir / f'{stem}_tracemalloc.txt'
+    top_stats = tracemalloc.take_snapshot().statistics('lineno')[:TRACEMALLOC_TOP_STATS]
+    tracemalloc_file.write_text('\n'.join(map(str, top_stats)))
+    pprint(f'Saved tracemalloc stats: "{tracemalloc_file}".')
+
+
+def report() -> None:
+    """Print the span tree once. Long-running commands call it before they block."""
+    global _root_span
+    if (root := _root_span) is None:
+        return
+    _root_span = None
+
+    if _profiler is not None:
+        _profiler.disable()
+    root.seconds = time.perf_counter() - root.seconds
+    root.calls = 1
+    _record_peak(root)
+
+    pprint(_build_tree(root, Tree(f'Profile: {_format_span(root)}', guide_style='dim')))
+    if config.PROFILE_DUMP_DIR:
+        _dump(root)
+    tracemalloc.stop()
+
+
+@contextmanager
+def profile(command: str) -> Iterator[None]:
+    global _root_span, _profiler
+    if not config.PROFILE:
+        yield
+        return
+
+    tracemalloc.start()
+    _root_span = Span(command, seconds=time.perf_counter())  # Start time until reported
+    token = _current_span.set(_root_span)
+    if config.PROFILE_DUMP_DIR:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    try:
+        yield
+    finally:
+        report()
+        _current_span.reset(token)
+        _profiler = None
@@ -1,4 +1,9 @@
-from typing import Iterable
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import IO, Iterable, Iterator
 
 from path import Path
 
@@ -13,6 +18,105 @@ def remove_files_maybe(files: Iterable[str]) -> None:
             Path(file).remove_p()
 
 
+LOCK_POLL_SECONDS = 0.1
+_UMASK = os.umask(0)
+os.umask(_UMASK)  # Read once, setting it is the only way to read it
+
+
+@contextmanager
+def replace_atomic(file: str) -> Iterator[IO[bytes]]:
+    """Yield a temp file that replaces the file by a rename once written.
+
+    Readers see either the old contents or the new ones, never a half-written file.
+    """
+    file = Path(file)
+    # Temp files are owner-only, the file keeps its mode or gets the usual one
+    mode = file.stat().st_mode & 0o777 if file.exists() else 0o666 & ~_UMASK
+    with tempfile.NamedTemporaryFile(dir=file.parent, prefix=f'.{file.name}.', delete=False) as tmp:
+        try:
+            yield tmp
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        except BaseException:
+            tmp.close()
+            Path(tmp.name).remove_p()
+            raise
+    os.chmod(tmp.name, mode)
+    os.replace(tmp.name, file)
+
+
+def write_text_atomic(file: str, text: str) -> bool:
+    """Write via a temp file and a rename. Return False and skip if the contents are unchanged."""
+    file = Path(file)
+    data = text.encode()
+    if file.is_file() and file.getsize() == len(data) and file.read_bytes() == data:
+        return False
+
+    with replace_atomic(file) as tmp:
+        tmp.write(data)
+    return True
+
+
+def _lock(lock_file: IO[str], blocking: bool) -> bool:
+    if sys.platform == 'win32':
+        import msvcrt
+
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(LOCK_POLL_SECONDS)
+
+    import fcntl
+
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _unlock(lock_file: IO[str]) -> None:
+    if sys.platform == 'win32':
+        import msvcrt
+
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def cache_lock() -> Iterator[None]:
+    """One cache writer at a time across processes. Readers never wait: every write is a rename."""
+    with open(config.CACHE_LOCK, 'a') as lock_file:
+        if not _lock(lock_file, blocking=False):
+            pprint(f'Waiting for another {config.APP_NAME} process to finish writing the cache...')
+            _lock(lock_file, blocking=True)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+
+
+@contextmanager
+def output_to_file() -> Iterator[None]:
+    """Send what the command prints to OUTPUT, if it's set. Messages still go to stderr."""
+    if not config.OUTPUT:
+        yield
+        return
+
+    output_file = Path(config.OUTPUT).expand()
+    with open(output_file, 'w', encoding='utf-8') as file, redirect_stdout(file):
+        yield
+    pprint(f'Saved output: "{output_file}".')
+
+
 def run_pytest_k(test_func: str) -> None:
     import pytest
+
     pytest.main(['-k', test_func])
@@ -0,0 +1,112 @@
+"""Serve read-only commands from the cache while it's fresh, refresh it by a background import when it's not.
+
+Reading exported files and Chrome's IndexedDB are the slow part of every command. With CACHE_TTL
+set, only `import`, stale caches and newly exported files pay for them, and a stale cache is still served
+while `import` runs in a process of its own.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Any
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.common.exceptions import UserError
+
+# Flags of the current command that don't make sense for the background import
+NOT_INHERITED = dict(OUTPUT='', PROFILE='False', PROFILE_DUMP_DIR='')
+REFRESH_CLAIM_SECONDS = 600  # A background import that hasn't succeeded by then is started again
+
+
+def mark_refreshed() -> None:
+    """Exported files and Chrome were checked just now, whether or not they had new words."""
+    config.CACHE_REFRESHED.touch()
+    config.CACHE_REFRESHING.remove_p()
+
+
+def refresh_claimed() -> bool:
+    """Whether a background import started recently, and may still be running."""
+    refreshing = config.CACHE_REFRESHING
+    return refreshing.exists() and time.time() - refreshing.getmtime() < REFRESH_CLAIM_SECONDS
+
+
+def _refreshed_at() -> float:
+    from polyglotka.importer import words_cache
+
+    if config.CACHE_REFRESHED.exists():
+        return config.CACHE_REFRESHED.getmtime()
+    return words_cache.mtime() or 0
+
+
+def cache_age() -> float | None:
+    """Seconds since the last import, None if there's no cache."""
+    from polyglotka.importer import words_cache
+
+    if not words_cache.exists():
+        return None
+    return time.time() - _refreshed_at()
+
+
+def new_files_waiting() -> bool:
+    """Whether exported files were added since the last import. Their words aren't in the cache yet."""
+    exported_files_dir = Path(config.EXPORTED_FILES_DIR)
+    refreshed_at = _refreshed_at()
+    return any(
+        max(file.getmtime(), file.getctime()) > refreshed_at  # Moved files keep their mtime
+        for pattern in (config.LR_FILES_GLOB_PATTERN, config.MGK_FILES_GLOB_PATTERN)
+        for file in exported_files_dir.glob(pattern)
+    )
+
+
+def _env_value(value: Any) -> str:
+    return ','.join(map(str, value)) if isinstance(value, tuple) else str(value)
+
+
+def overrides_env() -> dict[str, str | None]:
+    """Config values overridden by flags, as variables for another process. None unsets a variable.
+
+    Variables can't hold None, so a value overridden to None is passed by unsetting it, which works
+    only where None is the default.
+    """
+    defaults = type(config)().model_dump()  # Reads the same environment
+    env: dict[str, str | None] = {}
+    for name, value in config.model_dump().items():
+        if value == defaults[name]:
+            continue
+        if value is None and type(config).model_fields[name].default is not None:
+            raise UserError(f'{name} cannot be passed to the background import as None')
+        env[f'{config.ENV_PREFIX}{name}'] = None if value is None else _env_value(value)
+    return env | {f'{config.ENV_PREFIX}{name}': value for name, value in NOT_INHERITED.items()}
+
+
+def refresh_in_background() -> None:
+    config.CACHE_REFRESHING.touch()  # Claimed, so commands started meanwhile don't start imports of their own
+    with open(config.CACHE_REFRESH_LOG, 'w') as log:
+        subprocess.Popen(
+            [sys.executable, '-m', 'polyglotka.main', 'import'],
+            env={name: value for name, value in (os.environ | overrides_env()).items() if value is not None},
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,  # Outlives this command and its Ctrl-C
+        )
+
+
+def cache_first() -> bool:
+    """Whether a read-only command should read the cache without importing first."""
+    if config.CACHE_TTL <= 0 or (age := cache_age()) is None or new_files_waiting():
+        return False
+    if age < config.CACHE_TTL:
+        return True
+    if not config.CACHE_REFRESH_IN_BACKGROUND:
+        return False
+
+    if not refresh_claimed():
+        refresh_in_background()
+        log = config.CACHE_REFRESH_LOG
+        pprint(f'Cache is {age / 3600:.1f} hours old, refreshing it in the background: "{log}".')
+    return True
@@ -1,36 +1,142 @@
 import json
-from typing import Any, Dict, Generator, Optional
+from typing import Any, Dict, Generator, Iterable
 
 from path import Path
 
+from polyglotka.common import metrics
+from polyglotka.common.config import config
 from polyglotka.common.console import Progress, ProgressType
+from polyglotka.common.profiling import iterate
+from polyglotka.common.utils import write_text_atomic
 from polyglotka.importer.language_reactor.structures import (
     LRSavedItem,
     LRSavedPhrase,
     LRSavedWord,
 )
+from polyglotka.importer.language_reactor.media import drop_data_urls, store_item_media
+from polyglotka.importer.validation import ValidationReport
 
 
-def parse_saved_item(item_data: Dict[str, Any]) -> Optional[LRSavedItem]:
+def parse_saved_item(item_data: Dict[str, Any]) -> LRSavedItem:
     """Parse a raw JSON item into a SavedItem (SavedWord or SavedPhrase)."""
-    try:
-        item_type = item_data.get('itemType')
-        if item_type == 'WORD':
+    if not isinstance(item_data, dict):  # pyright: ignore
+        raise TypeError(f'Item is not an object: {type(item_data).__name__}')
+
+    match item_data.get('itemType'):
+        case 'WORD':
             return LRSavedWord(**item_data)
-        elif item_type == 'PHRASE':
+        case 'PHRASE':
             return LRSavedPhrase(**item_data)
-        else:
-            print(f"Warning: Unknown item type '{item_type}', skipping item")
-            return None
-    except Exception as e:
-        print(f'Warning: Failed to parse item as SavedItem: {e}')
-        print(
-            f"Item data keys: {list(item_data.keys()) if isinstance(item_data, dict) else 'Not a dict'}"  # pyright: ignore
-        )
-        return None
-
-
-def import_lr_items(lr_files: list[Path]) -> Generator[LRSavedItem, None, None]:
+        case item_type:
+            raise ValueError(f'Unknown item type: {item_type}')
+
+
+# Bumped whenever Word gains fields from LR items, so the items skipped so far are read again
+ITEM_VERSIONS_FORMAT = 2
+
+
+def load_item_versions() -> dict[str, int]:
+    """timeModified_ms of the LR items merged into the words cache, by key."""
+    if not config.CACHE_LR_VERSIONS.exists():
+        return {}
+    saved = json.loads(config.CACHE_LR_VERSIONS.read_text())
+    if saved.get('format') != ITEM_VERSIONS_FORMAT:  # Older versions were a bare dict of keys
+        return {}
+    return saved['items']
+
+
+def save_item_versions(versions: dict[str, int]) -> None:
+    saved = dict(format=ITEM_VERSIONS_FORMAT, items=versions)
+    write_text_atomic(config.CACHE_LR_VERSIONS, json.dumps(saved, ensure_ascii=False, separators=(',', ':')))
+
+
+def is_unchanged(item_data: Any, versions: dict[str, int]) -> bool:
+    """Checked on the raw JSON, before any validation."""
+    if not isinstance(item_data, dict) or (key := item_data.get('key')) not in versions:  # pyright: ignore
+        return False
+    return versions[key] == item_data.get('timeModified_ms')  # pyright: ignore
+
+
+READ_CHUNK_CHARS = 1024 * 1024
+
+
+def read_json_array(file: Path) -> Generator[Any, None, None]:
+    """Items of a top-level JSON array, parsed one at a time.
+
+    Only the item being parsed and the next chunk of the file are in memory, base64 payloads included.
+    """
+    decoder = json.JSONDecoder()
+    with open(file, encoding='utf-8') as reader:
+        buffer, pos, eof = '', 0, False
+
+        def skip(chars: str) -> bool:
+            """Skip whitespace and these chars, reading more if needed. False at the end of the file."""
+            nonlocal buffer, pos, eof
+            while True:
+                while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in chars):
+                    pos += 1
+                if pos < len(buffer):
+                    return True
+                if eof:
+                    return False
+                buffer, pos = reader.read(READ_CHUNK_CHARS), 0
+                eof = not buffer
+
+        if not skip('') or buffer[pos] != '[':
+            raise ValueError(f'Expected a JSON array in "{file}"')
+        pos += 1
+        while True:
+            if not skip(','):
+                raise ValueError(f'Unterminated JSON array in "{file}"')
+            if buffer[pos] == ']':
+                return
+            chunk_chars = READ_CHUNK_CHARS
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:  # A number at the very end may go on in the next chunk
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                more = reader.read(chunk_chars)  # The item goes on, read twice as much each time
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                chunk_chars *= 2
+            pos = end
+            yield item
+
+
+def validate_lr_items(
+    source: str, items_data: Iterable[Any], report: ValidationReport, versions: dict[str, int] | None
+) -> Generator[LRSavedItem, None, None]:
+    """Media is stored only for items that validate, one item at a time."""
+    failures = 0
+    try:
+        for item_data in items_data:
+            if versions is not None and is_unchanged(item_data, versions):
+                continue
+            try:
+                item = parse_saved_item(item_data)
+            except (ValueError, TypeError) as exc:  # pydantic's ValidationError is a ValueError
+                report.add(source, exc, drop_data_urls(item_data))
+                failures += 1
+                continue
+            store_item_media(item)
+            if versions is not None and item.learning_stage != 'SKIPPED':
+                versions[item.key] = item.time_modified_ms
+            yield item
+    finally:
+        metrics.add('parse_failures', failures, source='lr')  # Once per file
+
+
+def import_lr_items(
+    lr_files: list[Path], report: ValidationReport, versions: dict[str, int] | None = None
+) -> Generator[LRSavedItem, None, None]:
+    """Items of cumulative exports unchanged since the last import are skipped if `versions` are given.
+
+    The new versions are recorded in it. Skipped words aren't, the cache doesn't keep them.
+    """
     if not lr_files:
         return
     with Progress(
@@ -40,8 +146,7 @@ def import_lr_items(lr_files: list[Path]) -> Generator[LRSavedItem, None, None]:
         total_tasks=len(lr_files),
     ) as progress:
         for lr_file in lr_files:
-            for item in json.loads(lr_file.read_text()):
-                saved_item: LRSavedWord | LRSavedPhrase | None = parse_saved_item(item)
-                assert saved_item
-                yield saved_item
+            metrics.add('read_bytes', lr_file.getsize(), source='lr')
+            items = validate_lr_items(lr_file.name, read_json_array(lr_file), report, versions)
+            yield from iterate('Reading LR items', items)
             progress.update(advance=1)
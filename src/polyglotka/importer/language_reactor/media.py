@@ -0,0 +1,72 @@
+"""Content-addressed store for the audio and thumbnails embedded in LR exports as base64 data URLs."""
+
+import base64
+import hashlib
+import mimetypes
+import re
+from typing import Any, Iterator
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.language_reactor.structures import LRSavedItem
+
+DATA_URL_HEADER_PATTERN = re.compile(r'data:(?P<mimetype>[^;,]*)[^,]*;base64,')
+DECODE_CHUNK_CHARS = 4 * 16 * 1024  # Base64 decodes in groups of 4 chars
+EXTENSIONS = {
+    'audio/mp3': '.mp3',
+    'audio/mpeg': '.mp3',
+    'image/jpeg': '.jpg',
+}  # mimetypes lacks or varies on some
+
+
+def media_path(ref: str) -> Path:
+    return config.CACHE_MEDIA / ref[:2] / ref
+
+
+def _decoded_chunks(data_url: str, start: int) -> Iterator[bytes]:
+    for chunk_start in range(start, len(data_url), DECODE_CHUNK_CHARS):
+        yield base64.b64decode(data_url[chunk_start : chunk_start + DECODE_CHUNK_CHARS])
+
+
+def store_data_url(data_url: str) -> str:
+    """Decode the data URL chunk by chunk into the store and return its reference: `<sha256>.<ext>`.
+
+    The reference is hashed first, so media stored by an earlier export isn't written again.
+    """
+    if not (header := DATA_URL_HEADER_PATTERN.match(data_url)):
+        return ''
+    extension = EXTENSIONS.get(header['mimetype']) or mimetypes.guess_extension(header['mimetype']) or '.bin'
+    digest = hashlib.sha256()
+    for chunk in _decoded_chunks(data_url, header.end()):
+        digest.update(chunk)
+
+    ref = f'{digest.hexdigest()}{extension}'
+    if not (path := media_path(ref)).exists():
+        path.parent.makedirs_p()
+        with replace_atomic(path) as tmp:
+            for chunk in _decoded_chunks(data_url, header.end()):
+                tmp.write(chunk)
+    return ref
+
+
+def store_item_media(item: LRSavedItem) -> None:
+    """Swap the data URLs of a validated item for store references, or drop them.
+
+    SKIPPED items reach neither the cache nor a deck, so their media is dropped.
+    """
+    keep = config.LR_MEDIA and item.learning_stage in ('KNOWN', 'LEARNING')
+    phrase = item.context.phrase if item.context else None
+    for media in (item.audio, phrase and phrase.thumb_prev, phrase and phrase.thumb_next):
+        if media and media.data_url.startswith('data:'):
+            media.data_url = store_data_url(media.data_url) if keep else ''
+
+
+def drop_data_urls(obj: Any) -> Any:
+    """The raw item without its base64 payloads, e.g. for the quarantine file."""
+    if isinstance(obj, dict):
+        return {key: drop_data_urls(value) for key, value in obj.items()}  # pyright: ignore
+    if isinstance(obj, list):
+        return [drop_data_urls(value) for value in obj]  # pyright: ignore
+    return '' if isinstance(obj, str) and obj.startswith('data:') else obj
@@ -23,7 +23,7 @@ class ItemAudio(BaseModel):
     voice: Optional[str] = None
     output_format: str = Field(alias='outputFormat')  # e.g. 'Audio24Khz48KBitRateMonoMp3'
     date_created: int = Field(alias='dateCreated')  # unix timestamp
-    data_url: str = Field(alias='dataURL')
+    data_url: str = Field(alias='dataURL')  # Media store reference after import, see media.py
 
 
 class ThumbImage(BaseModel):
@@ -32,7 +32,7 @@ class ThumbImage(BaseModel):
     height: int
     width: int
     time: int
-    data_url: str = Field(alias='dataURL')
+    data_url: str = Field(alias='dataURL')  # Media store reference after import, see media.py
 
 
 class UdSingle(BaseModel):
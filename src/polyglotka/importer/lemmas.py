@@ -0,0 +1,107 @@
+"""Lemma frequencies from the subtitle tokens of saved LR items, stored as numpy arrays."""
+
+from typing import Iterable, get_args
+
+import numpy as np
+
+from polyglotka.common.config import config
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.language_reactor.structures import LRSavedItem, UdSingle
+
+POS_TAGS: list[str] = list(get_args(UdSingle.model_fields['pos'].annotation))
+SKIPPED_POS_TAGS = {'PUNCT', 'SYM', 'NUM', 'X', '_', 'WS'}
+CURRENT_SUBTITLE = '1'  # '0' and '2' are the previous and the next ones
+
+
+class LemmaIndex:
+    """Interned (language, lemma) ids with token counts per POS tag.
+
+    Items are counted once per key, so cumulative LR exports can be imported again and again.
+    """
+
+    def __init__(
+        self,
+        languages: np.ndarray | None = None,
+        lemmas: np.ndarray | None = None,
+        counts: np.ndarray | None = None,
+        item_keys: np.ndarray | None = None,
+    ) -> None:
+        self.languages: list[str] = [] if languages is None else languages.tolist()
+        self.lemmas: list[str] = [] if lemmas is None else lemmas.tolist()
+        self.counts: np.ndarray = np.zeros((0, len(POS_TAGS)), np.int32) if counts is None else counts
+        self.item_keys: set[str] = set() if item_keys is None else set(item_keys.tolist())
+
+        self.ids: dict[tuple[str, str], int] = {
+            key: i for i, key in enumerate(zip(self.languages, self.lemmas))
+        }
+        self._new_tokens: list[tuple[int, int]] = []  # (lemma id, POS index), flushed into counts
+
+    @classmethod
+    def load(cls) -> 'LemmaIndex':
+        if not config.CACHE_LEMMAS.exists():
+            return cls()
+        with np.load(config.CACHE_LEMMAS) as arrays:
+            if arrays['pos_tags'].tolist() != POS_TAGS:
+                return cls()  # The LR schema changed, start over
+            return cls(arrays['languages'], arrays['lemmas'], arrays['counts'], arrays['item_keys'])
+
+    def save(self) -> None:
+        self._flush()
+        with replace_atomic(config.CACHE_LEMMAS) as file:
+            np.savez_compressed(
+                file,
+                languages=np.array(self.languages, dtype=str),
+                lemmas=np.array(self.lemmas, dtype=str),
+                counts=self.counts,
+                item_keys=np.array(sorted(self.item_keys), dtype=str),
+                pos_tags=np.array(POS_TAGS, dtype=str),
+            )
+
+    def _intern(self, language: str, lemma: str) -> int:
+        if (lemma_id := self.ids.get((language, lemma))) is None:
+            lemma_id = self.ids[(language, lemma)] = len(self.lemmas)
+            self.languages.append(language)
+            self.lemmas.append(lemma)
+        return lemma_id
+
+    def _flush(self) -> None:
+        if len(self.counts) < len(self.lemmas):
+            self.counts = np.vstack(
+                [self.counts, np.zeros((len(self.lemmas) - len(self.counts), len(POS_TAGS)), np.int32)]
+            )
+        if self._new_tokens:
+            lemma_ids, pos_ids = np.array(self._new_tokens, dtype=np.int64).T
+            np.add.at(self.counts, (lemma_ids, pos_ids), 1)
+            self._new_tokens.clear()
+
+    def add(self, item: LRSavedItem) -> None:
+        if item.key in self.item_keys:
+            return
+        self.item_keys.add(item.key)
+        if item.context is None:
+            return
+
+        for token in item.context.phrase.subtitle_tokens.get(CURRENT_SUBTITLE) or []:
+            if token.pos not in SKIPPED_POS_TAGS:
+                lemma = (token.lemma or token.form).text.strip()
+                if lemma:
+                    self._new_tokens.append(
+                        (self._intern(item.lang_code_g, lemma), POS_TAGS.index(token.pos))
+                    )
+
+    def totals(self) -> np.ndarray:
+        self._flush()
+        return self.counts.sum(axis=1)
+
+    def top_pos(self) -> np.ndarray:
+        self._flush()
+        return np.array(POS_TAGS, dtype=str)[self.counts.argmax(axis=1)]
+
+
+@span('Indexing lemmas')
+def update(items: Iterable[LRSavedItem]) -> None:
+    index = LemmaIndex.load()
+    for item in items:
+        index.add(item)
+    index.save()
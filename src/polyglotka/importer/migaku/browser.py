@@ -8,10 +8,13 @@ from typing import Any, Generator
 
 from path import Path
 
+from polyglotka.common import metrics
 from polyglotka.common.config import config
 from polyglotka.common.console import pprint
 from polyglotka.common.exceptions import UserError
-from polyglotka.importer.migaku.importer import MigakuItem
+from polyglotka.common.profiling import span
+from polyglotka.importer.migaku.importer import MigakuItem, validate_migaku_item
+from polyglotka.importer.validation import ValidationReport
 
 MIGAKU_DOMAIN = 'https_study.migaku.com_0'
 
@@ -128,22 +131,29 @@ def _query_wordlist(sqlite_data: bytes) -> list[dict[str, Any]]:
 
 
 def fetch_migaku_words_from_chrome(
+    report: ValidationReport,
     languages: list[str] | None = None,
 ) -> Generator[MigakuItem, None, None]:
     """Fetch Migaku words by reading Chrome's IndexedDB storage directly from disk."""
-    chrome_path = _get_chrome_profile_path()
-    pprint(f'Reading from Chrome data: "{chrome_path}"')
+    with span('Finding Chrome blob'):
+        chrome_path = _get_chrome_profile_path()
+        pprint(f'Reading from Chrome data: "{chrome_path}"')
 
-    blob_dir = _find_migaku_blob_path(chrome_path)
-    pprint(f'Found Migaku data in: {blob_dir.parent.parent.name}')
+        blob_dir = _find_migaku_blob_path(chrome_path)
+        pprint(f'Found Migaku data in: {blob_dir.parent.parent.name}')
 
-    blob_path = _find_sqlite_blob(blob_dir)
-    sqlite_data = _decompress_blob(blob_path)
-    word_dicts = _query_wordlist(sqlite_data)
+        blob_path = _find_sqlite_blob(blob_dir)
+    metrics.add('read_bytes', blob_path.getsize(), source='chrome')
+    with span('Decompressing Chrome blob'):
+        sqlite_data = _decompress_blob(blob_path)
+    with span('Querying Migaku DB'):
+        word_dicts = _query_wordlist(sqlite_data)
 
     if languages:
         word_dicts = [w for w in word_dicts if w.get('language') in languages]
 
     pprint(f'Extracted {len(word_dicts)} words from Migaku')
-    for word_dict in word_dicts:
-        yield MigakuItem.model_validate(word_dict)
+    with span('Validating Migaku items'):
+        items = [validate_migaku_item('Chrome', word_dict, report) for word_dict in word_dicts]
+    metrics.add('parse_failures', items.count(None), source='chrome')
+    yield from filter(None, items)
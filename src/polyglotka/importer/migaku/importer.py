@@ -1,10 +1,13 @@
-from typing import Generator
+from typing import Any, Generator
 
 import pandas as pd
 from path import Path
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 
+from polyglotka.common import metrics
 from polyglotka.common.console import Progress, ProgressType
+from polyglotka.common.profiling import iterate, span
+from polyglotka.importer.validation import ValidationReport
 
 
 class MigakuItem(BaseModel):
@@ -29,7 +32,21 @@ class MigakuItem(BaseModel):
         )[self.migaku_known_status]
 
 
-def import_migaku_items(migaku_files: list[Path]) -> Generator[MigakuItem, None, None]:
+def validate_migaku_item(
+    source: str, item_data: dict[str, Any], report: ValidationReport
+) -> MigakuItem | None:
+    try:
+        item = MigakuItem.model_validate(item_data)
+        item.learning_stage  # Unknown statuses fail here, not at model_dump time
+        return item
+    except (ValueError, KeyError) as exc:
+        report.add(source, exc, item_data)
+        return None
+
+
+def import_migaku_items(
+    migaku_files: list[Path], report: ValidationReport
+) -> Generator[MigakuItem, None, None]:
     if not migaku_files:
         return
     with Progress(
@@ -39,6 +56,18 @@ def import_migaku_items(migaku_files: list[Path]) -> Generator[MigakuItem, None,
         total_tasks=len(migaku_files),
     ) as progress:
         for migaku_file in migaku_files:
-            dataframe: pd.DataFrame = pd.read_csv(migaku_file).fillna('')  # type: ignore
-            yield from (MigakuItem.model_validate(row.to_dict()) for _, row in dataframe.iterrows())  # type: ignore
+            metrics.add('read_bytes', migaku_file.getsize(), source='migaku')
+            with span('Reading Migaku CSV'):
+                dataframe: pd.DataFrame = pd.read_csv(migaku_file).fillna('')  # type: ignore
+            items = (
+                validate_migaku_item(migaku_file.name, row.to_dict(), report)  # type: ignore
+                for _, row in dataframe.iterrows()  # type: ignore
+            )
+            failures = 0
+            for item in iterate('Validating Migaku items', items):
+                if item is None:
+                    failures += 1
+                else:
+                    yield item
+            metrics.add('parse_failures', failures, source='migaku')
             progress.update(advance=1)
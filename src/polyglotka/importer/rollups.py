@@ -0,0 +1,56 @@
+"""Word counts per day, language, and stage, kept in sync with the words cache at import time."""
+
+import json
+from collections import Counter
+from typing import Iterable
+
+from polyglotka.common.config import config
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import write_text_atomic
+from polyglotka.importer.words import Word
+
+Bucket = tuple[str, str, str]  # (language, stage, ISO day)
+
+
+def bucket(word: Word) -> Bucket:
+    return word.language, word.learning_stage, word.date.date().isoformat()
+
+
+def build(words: Iterable[Word]) -> Counter[Bucket]:
+    return Counter(map(bucket, words))
+
+
+def read() -> Counter[Bucket]:
+    rollups: Counter[Bucket] = Counter()
+    if config.CACHE_ROLLUPS.exists():
+        for lang, stages in json.loads(config.CACHE_ROLLUPS.read_text()).items():
+            for stage, days in stages.items():
+                rollups.update({(lang, stage, day): count for day, count in days.items()})
+    return rollups
+
+
+def write(rollups: Counter[Bucket]) -> None:
+    nested: dict[str, dict[str, dict[str, int]]] = {}
+    for (lang, stage, day), count in sorted(rollups.items()):
+        if count:
+            nested.setdefault(lang, {}).setdefault(stage, {})[day] = count
+    write_text_atomic(config.CACHE_ROLLUPS, json.dumps(nested, indent=2, ensure_ascii=False))
+
+
+@span('Updating rollups')
+def update(old_words: set[Word], new_words: set[Word]) -> None:
+    """Apply only the words whose bucket changed. Rebuild if the rollups don't match the old words."""
+    rollups = read()
+    if rollups.total() != len(old_words):
+        write(build(new_words))
+        return
+
+    old_buckets = {(w.language, w.word): bucket(w) for w in old_words}
+    new_buckets = {(w.language, w.word): bucket(w) for w in new_words}
+    for key, old_bucket in old_buckets.items():
+        if new_buckets.get(key) != old_bucket:
+            rollups[old_bucket] -= 1
+    for key, new_bucket in new_buckets.items():
+        if old_buckets.get(key) != new_bucket:
+            rollups[new_bucket] += 1
+    write(rollups)
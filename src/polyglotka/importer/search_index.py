@@ -0,0 +1,178 @@
+"""Prefix, substring and fuzzy search over the words of one language, saved next to its cache file.
+
+Words are sorted by their casefolded form, so a prefix is a binary search away. Every character
+and every pair of adjacent characters has a sorted list of the rows containing it: substrings,
+kana and kanji fragments included, are found by intersecting the lists of their n-grams, and
+fuzzy matches by counting shared pairs.
+"""
+
+from typing import Iterable, NoReturn
+
+import numpy as np
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.words import LearningStage, Word
+from polyglotka.importer.words_index import STAGES
+
+SUFFIX = '.search.npz'
+FUZZY_MIN_SIMILARITY = 0.5  # Dice coefficient of the character pairs
+MAX_CHAR = '\U0010ffff'
+START, END = '\x02', '\x03'  # Pairs with them make first and last characters count for fuzzy matches
+
+
+def ngrams(text: str) -> set[str]:
+    return set(text) | padded_bigrams(text)
+
+
+def padded_bigrams(text: str) -> set[str]:
+    return bigrams(f'{START}{text}{END}')
+
+
+def bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        keys: np.ndarray,
+        words: np.ndarray,
+        stage_codes: np.ndarray,
+        grams: np.ndarray,
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        bigram_counts: np.ndarray,
+    ) -> None:
+        self.keys = keys  # Casefolded words, sorted
+        self.words = words
+        self.stage_codes = stage_codes
+        self.grams = grams  # Sorted n-grams, the rows of grams[i] are postings[offsets[i] : offsets[i + 1]]
+        self.offsets = offsets
+        self.postings = postings
+        self.bigram_counts = bigram_counts
+
+    @classmethod
+    @span('Building search index')
+    def build(cls, words: Iterable[Word]) -> 'SearchIndex':
+        rows = sorted((w.word.casefold(), w.word, STAGES.index(w.learning_stage)) for w in words)
+        keys = [key for key, _, _ in rows]
+
+        gram_rows: dict[str, list[int]] = {}
+        for row, key in enumerate(keys):
+            for gram in ngrams(key):
+                gram_rows.setdefault(gram, []).append(row)
+        grams = sorted(gram_rows)
+        lengths = [len(gram_rows[gram]) for gram in grams]
+
+        return cls(
+            keys=np.array(keys, dtype=str),
+            words=np.array([word for _, word, _ in rows], dtype=str),
+            stage_codes=np.array([code for _, _, code in rows], dtype=np.int8),
+            grams=np.array(grams, dtype=str),
+            offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            postings=np.array([row for gram in grams for row in gram_rows[gram]], dtype=np.int32),
+            bigram_counts=np.array([len(padded_bigrams(key)) for key in keys], dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, file: str) -> 'SearchIndex':
+        with np.load(file) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def save(self, file: str) -> None:
+        with replace_atomic(file) as tmp:
+            np.savez(tmp, **vars(self))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rows_of(self, gram: str) -> np.ndarray:
+        i = int(np.searchsorted(self.grams, gram))
+        if i == len(self.grams) or self.grams[i] != gram:
+            return np.empty(0, dtype=np.int32)
+        return self.postings[self.offsets[i] : self.offsets[i + 1]]
+
+    def prefixed(self, prefix: str) -> np.ndarray:
+        start, stop = np.searchsorted(self.keys, [prefix, prefix + MAX_CHAR])
+        return np.arange(start, stop)
+
+    def containing(self, fragment: str) -> np.ndarray:
+        grams = bigrams(fragment) or set(fragment)
+        rows = self._rows_of(grams.pop())
+        for gram in grams:
+            rows = np.intersect1d(rows, self._rows_of(gram), assume_unique=True)
+        if len(fragment) > 2:  # Pairs can match in another order
+            rows = rows[np.char.find(self.keys[rows], fragment) >= 0]
+        return rows
+
+    def similar(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Rows sharing enough character pairs with the text, and their similarity, most similar first."""
+        grams = padded_bigrams(text)
+        rows, shared = np.unique(np.concatenate([self._rows_of(gram) for gram in grams]), return_counts=True)
+        similarity = 2 * shared / (len(grams) + self.bigram_counts[rows])
+        order = np.argsort(-similarity, kind='stable')
+        keep = order[similarity[order] >= FUZZY_MIN_SIMILARITY]
+        return rows[keep], similarity[keep]
+
+    def search(self, query: str, stage: str = '', limit: int = 0) -> list[tuple[str, LearningStage, str]]:
+        """(word, stage, match) for exact, prefix, substring and then fuzzy matches."""
+        query = query.casefold()
+        try:
+            stage_code = STAGES.index(LearningStage(stage.upper())) if stage else None
+        except ValueError:
+            raise UserError(f'STAGE must be one of {tuple(STAGES)}, not this: {repr(stage)}')
+
+        matches: list[tuple[str, LearningStage, str]] = []
+        seen: set[int] = set()
+        prefixed = self.prefixed(query)
+        for match, rows in (
+            ('exact', prefixed[self.keys[prefixed] == query]),
+            ('prefix', prefixed),
+            ('substring', self.containing(query)),
+            ('fuzzy', self.similar(query)[0]),
+        ):
+            for row in rows.tolist():
+                if row in seen or (stage_code is not None and self.stage_codes[row] != stage_code):
+                    continue
+                seen.add(row)
+                matches.append((str(self.words[row]), STAGES[self.stage_codes[row]], match))
+                if len(matches) == limit:
+                    return matches
+        return matches
+
+
+def _unknown_lang(lang: str, langs: set[str]) -> NoReturn:
+    raise UserError(f'LANG must be one of {tuple(sorted(langs))}, not this: {repr(lang)}')
+
+
+_loaded: dict[str, SearchIndex] = {}  # By cache file, kept in memory by `run` and `serve`
+
+
+def load_search_index(lang: str, words: Iterable[Word]) -> SearchIndex:
+    """The index of one language, built from its words and saved next to their cache file on first use.
+
+    The words are those `import_words` just returned for the language, so they are the cached ones.
+    """
+    from polyglotka.importer import words_cache
+
+    lang_words = [w for w in words if w.language == lang]
+    # Without a manifest, the words are of an older version and are indexed until the next import
+    if (manifest := words_cache.read_manifest()) is None:
+        return SearchIndex.build(lang_words or _unknown_lang(lang, set()))
+    if not (partition := manifest.partitions.get(lang)):
+        _unknown_lang(lang, set(manifest.partitions))
+
+    if (index := _loaded.get(partition.file)) is None:
+        file = config.CACHE_WORDS / f'{partition.file.removesuffix(".json")}{SUFFIX}'
+        if file.exists():
+            with span('Loading search index'):
+                index = SearchIndex.load(file)
+        else:
+            index = SearchIndex.build(lang_words)
+            index.save(file)
+        _loaded.clear()
+        _loaded[partition.file] = index
+    return index
@@ -0,0 +1,148 @@
+"""Delta-encoded snapshots of the cached words, saved by every import that changes them.
+
+The oldest kept snapshot is a full base, every later one stores only the rows that changed
+since the previous snapshot. Rows are (language, word, stage), sorted, so two states are
+compared by a single merge pass.
+"""
+
+import gzip
+import json
+import re
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.words import Word
+
+Row = tuple[str, str, str]  # Language, word, stage
+ID_FORMAT = '%Y-%m-%d_%H-%M-%S'
+SUFFIX = '.json.gz'
+
+
+def to_rows(words: Iterable[Word]) -> list[Row]:
+    return sorted((w.language, w.word, str(w.learning_stage)) for w in words)
+
+
+def merge_diff(old: list[Row], new: list[Row]) -> Iterator[tuple[Row | None, Row | None]]:
+    """(old, new) pairs for every (language, word) that differs, by one pass over both sorted states."""
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i][:2] == new[j][:2]:
+            if old[i][2] != new[j][2]:
+                yield old[i], new[j]
+            i += 1
+            j += 1
+        elif old[i][:2] < new[j][:2]:
+            yield old[i], None
+            i += 1
+        else:
+            yield None, new[j]
+            j += 1
+    yield from ((row, None) for row in old[i:])
+    yield from ((None, row) for row in new[j:])
+
+
+def list_ids() -> list[str]:
+    if not config.CACHE_SNAPSHOTS.is_dir():
+        return []
+    return sorted(file.name.removesuffix(SUFFIX) for file in config.CACHE_SNAPSHOTS.files(f'*{SUFFIX}'))
+
+
+def _path(snapshot_id: str) -> Path:
+    return config.CACHE_SNAPSHOTS / f'{snapshot_id}{SUFFIX}'
+
+
+def _read(snapshot_id: str) -> dict[str, Any]:
+    with gzip.open(_path(snapshot_id), 'rt', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _write(snapshot_id: str, snapshot: dict[str, Any]) -> None:
+    config.CACHE_SNAPSHOTS.makedirs_p()
+    with replace_atomic(_path(snapshot_id)) as tmp, gzip.GzipFile(fileobj=tmp, mode='wb', mtime=0) as file:
+        file.write(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')).encode())
+
+
+@span('Loading snapshot')
+def load(snapshot_id: str) -> list[Row]:
+    """Replay the deltas since the nearest base."""
+    ids = list_ids()
+    chain: list[dict[str, Any]] = []
+    for chain_id in reversed(ids[: ids.index(snapshot_id) + 1]):
+        chain.append(snapshot := _read(chain_id))
+        if snapshot['base']:
+            break
+
+    state: dict[tuple[str, str], str] = {}
+    for snapshot in reversed(chain):
+        for lang, word in snapshot['unset']:
+            del state[(lang, word)]
+        for lang, word, stage in snapshot['set']:
+            state[(lang, word)] = stage
+    return sorted((lang, word, stage) for (lang, word), stage in state.items())
+
+
+def _prune() -> None:
+    ids = list_ids()
+    if len(ids) <= config.SNAPSHOTS_KEEP:
+        return
+
+    first_kept = ids[-config.SNAPSHOTS_KEEP]
+    if not _read(first_kept)['base']:
+        _write(first_kept, dict(base=True, set=load(first_kept), unset=[]))
+    for snapshot_id in ids[: -config.SNAPSHOTS_KEEP]:
+        _path(snapshot_id).remove_p()
+
+
+@span('Saving snapshot')
+def save(words: Iterable[Word]) -> str | None:
+    """Return the id of the new snapshot, None if nothing changed since the latest one."""
+    if config.SNAPSHOTS_KEEP <= 0:
+        return None
+
+    rows = to_rows(words)
+    snapshot_id = datetime.now().strftime(ID_FORMAT)
+    if not (ids := list_ids()):
+        _write(snapshot_id, dict(base=True, set=rows, unset=[]))
+        return snapshot_id
+
+    changes = list(merge_diff(load(ids[-1]), rows))
+    if not changes:
+        return None
+    if snapshot_id <= ids[-1]:  # Another import within the same second
+        snapshot_id = f'{ids[-1]}_'
+    _write(
+        snapshot_id,
+        dict(
+            base=False,
+            set=[new for _, new in changes if new is not None],
+            unset=[old[:2] for old, new in changes if new is None and old is not None],
+        ),
+    )
+    _prune()
+    return snapshot_id
+
+
+def resolve(selector: str | int) -> str:
+    """A snapshot id from an index like -1 (the latest) or from an id prefix like 2025-06 (the latest match).
+
+    Whole numbers are always indexes, so a year alone is written as 2025-.
+    """
+    ids = list_ids()
+    if not ids:
+        raise UserError('No snapshots yet. They are saved by "polyglotka import"')
+
+    selector = str(selector)
+    if re.fullmatch(r'-?\d+', selector):
+        if -len(ids) <= int(selector) < len(ids):
+            return ids[int(selector)]
+    elif matches := [snapshot_id for snapshot_id in ids if snapshot_id.startswith(selector)]:
+        return matches[-1]
+    raise UserError(
+        f'Snapshot {repr(selector)} is not found. Available snapshots: \n  - ' + '\n  - '.join(ids)
+    )
@@ -0,0 +1,144 @@
+"""Word sources imported concurrently, each in its own thread, streaming batches to one merge."""
+
+import contextvars
+import queue
+import threading
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
+
+from path import Path
+
+from polyglotka.common import metrics
+from polyglotka.common.config import config
+from polyglotka.common.profiling import span
+from polyglotka.importer import words_cache
+from polyglotka.importer.language_reactor.importer import LRSavedWord, import_lr_items
+from polyglotka.importer.migaku.importer import MigakuItem, import_migaku_items
+from polyglotka.importer.validation import ValidationReport
+from polyglotka.importer.words import Word
+
+BATCH_SIZE = 1000
+MAX_QUEUED_BATCHES = 16  # Backpressure: fast sources wait for the merge instead of piling up items
+PUT_TIMEOUT_SECONDS = 0.1
+JOIN_TIMEOUT_SECONDS = 5.0  # A source stuck in a read can't see the stop, its daemon thread is left behind
+
+
+@dataclass
+class Source:
+    name: str
+    priority: int  # Wins between occurrences with equal dates, like the order of sources used to
+    produce: Callable[[ValidationReport], Iterable[Any]]
+    files: list[Path] = field(default_factory=list)
+
+
+@dataclass
+class Batch:
+    source: Source
+    items: list[Any]  # As produced, e.g. LR phrases for the lemma index
+    words: list[Word]
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def to_word(item: Any) -> Word | None:
+    if isinstance(item, Word):
+        return item
+    if isinstance(item, (LRSavedWord, MigakuItem)):
+        return Word(**item.model_dump())
+    return None  # LR phrases
+
+
+def _fetch_chrome_items(report: ValidationReport) -> Iterable[MigakuItem]:
+    from polyglotka.importer.migaku.browser import fetch_migaku_words_from_chrome
+
+    with span('Chrome import'):
+        return list(fetch_migaku_words_from_chrome(report))
+
+
+def find_sources(lr_versions: dict[str, int] | None = None) -> list[Source]:
+    """The registry: the cache plus every source with something to import.
+
+    LR items found in `lr_versions` with the same timeModified_ms are already in the cache and are skipped.
+    """
+    with span('Globbing files'):
+        migaku_files: list[Path] = Path(config.EXPORTED_FILES_DIR).glob(config.MGK_FILES_GLOB_PATTERN)
+        lr_files: list[Path] = Path(config.EXPORTED_FILES_DIR).glob(config.LR_FILES_GLOB_PATTERN)
+
+    sources = [Source('cache', 0, lambda report: words_cache.read())]
+    if migaku_files:
+        sources.append(
+            Source('migaku', 1, lambda report: import_migaku_items(migaku_files, report), migaku_files)
+        )
+    elif config.CHROME:  # CSV files take precedence over Chrome
+        sources.append(Source('chrome', 2, _fetch_chrome_items))
+    if lr_files:
+        sources.append(
+            Source('lr', 3, lambda report: import_lr_items(lr_files, report, lr_versions), lr_files)
+        )
+    return sources
+
+
+def _produce(
+    source: Source,
+    report: ValidationReport,
+    batches: queue.Queue[Batch | BaseException | Source],
+    stop: threading.Event,
+) -> None:
+    def put(message: Batch | BaseException | Source) -> None:
+        while not stop.is_set():
+            try:
+                return batches.put(message, timeout=PUT_TIMEOUT_SECONDS)
+            except queue.Full:
+                pass
+
+    try:
+        with span(f'Producing {source.name}'):
+            for items in batched(source.produce(report), BATCH_SIZE):
+                metrics.add('items', len(items), source=source.name)
+                put(Batch(source, items, [w for w in map(to_word, items) if w is not None]))
+                if stop.is_set():
+                    return
+        put(source)  # Done
+    except BaseException as exc:
+        put(exc)
+
+
+def stream_batches(sources: list[Source], report: ValidationReport) -> Iterator[Batch]:
+    """Run every source in a thread and yield their batches as they come.
+
+    The first error stops the other sources and is raised here.
+    """
+    batches: queue.Queue[Batch | BaseException | Source] = queue.Queue(MAX_QUEUED_BATCHES)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            # Threads don't inherit context vars, and the profiling spans live in them
+            target=contextvars.copy_context().run,
+            args=(_produce, source, report, batches, stop),
+            name=f'{config.APP_NAME}-{source.name}',
+            daemon=True,
+        )
+        for source in sources
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = len(sources)
+        while running:
+            match batches.get():
+                case Batch() as batch:
+                    yield batch
+                case Source():
+                    running -= 1
+                case BaseException() as exc:
+                    raise exc
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(JOIN_TIMEOUT_SECONDS)
@@ -0,0 +1,77 @@
+import json
+import threading
+from collections import Counter, defaultdict
+from types import TracebackType
+from typing import Any, Optional, Self, TextIO, Type
+
+from pydantic import ValidationError
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+
+MAX_SAMPLES_PER_ERROR_TYPE = 3
+MAX_SAMPLE_LENGTH = 100
+
+
+def error_type(exc: Exception) -> str:
+    if isinstance(exc, ValidationError) and (errors := exc.errors()):
+        return f'{errors[0]["type"]} at {".".join(map(str, errors[0]["loc"]))}'
+    return f'{type(exc).__name__}: {exc}'
+
+
+def describe_item(source: str, item: Any) -> str:
+    if isinstance(item, dict) and (name := item.get('key') or item.get('dictForm')):  # pyright: ignore
+        return f'{source}: {name}'
+    return f'{source}: {repr(item)[:MAX_SAMPLE_LENGTH]}'
+
+
+class ValidationReport:
+    """Counts invalid items per error type, keeps a few samples, and quarantines the items.
+
+    Memory stays bounded however many items fail: the items themselves go straight to a JSONL file.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self.samples: defaultdict[str, list[str]] = defaultdict(list)
+        self._quarantine: TextIO | None = None
+        self._lock = threading.Lock()  # Sources report from their own threads
+
+    def add(self, source: str, exc: Exception, item: Any) -> None:
+        with self._lock:
+            self._add(source, exc, item)
+
+    def _add(self, source: str, exc: Exception, item: Any) -> None:
+        key = error_type(exc)
+        self.counts[key] += 1
+        if len(self.samples[key]) < MAX_SAMPLES_PER_ERROR_TYPE:
+            self.samples[key].append(describe_item(source, item))
+
+        if self._quarantine is None:
+            self._quarantine = open(config.CACHE_QUARANTINE, 'w', encoding='utf-8')
+        record = dict(source=source, error_type=key, error=str(exc), item=item)
+        self._quarantine.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()  # The items quarantined so far are worth seeing when a source fails too
+
+    def close(self) -> None:
+        """Print the summary once all sources are parsed."""
+        if self._quarantine is None:
+            return
+        self._quarantine.close()
+        self._quarantine = None
+
+        pprint(f'Skipped {self.counts.total()} invalid items, quarantined in "{config.CACHE_QUARANTINE}":')
+        for key, count in self.counts.most_common():
+            pprint(f'  {count} x {key}')
+            for sample in self.samples[key]:
+                pprint(f'    e.g. {sample}')
@@ -1,7 +1,8 @@
+from contextlib import contextmanager
 from datetime import datetime
 from enum import StrEnum
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from path import Path
 from pydantic import AliasChoices, BaseModel, Field, model_validator
@@ -9,9 +10,10 @@ from pydantic import AliasChoices, BaseModel, Field, model_validator
 from polyglotka.common.config import config
 from polyglotka.common.console import pprint
 from polyglotka.common.exceptions import UserError
-from polyglotka.common.utils import remove_files_maybe
-from polyglotka.importer.language_reactor.importer import LRSavedWord, import_lr_items
-from polyglotka.importer.migaku.importer import MigakuItem, import_migaku_items
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import cache_lock, remove_files_maybe
+from polyglotka.importer.language_reactor.structures import LRSavedItem
+from polyglotka.importer.validation import ValidationReport
 
 
 class LearningStage(StrEnum):
@@ -25,6 +27,11 @@ class Word(BaseModel):
     language: str = Field(validation_alias=AliasChoices('language', 'lang_code_g'))
     learning_stage: LearningStage
     date: datetime
+    freq_rank: int | None = None  # LR only
+    dioco_freq: int | str | None = None  # LR only, can be "PUNCT_PLUS" or "PROPN_PLUS"
+    media: dict[str, str] = {}  # LR only: 'audio', 'thumb_prev', 'thumb_next' -> media store reference
+    context: str = ''  # LR only: subtitle line the word was saved from
+    translation: str = ''  # LR only: translation of the line
 
     def __hash__(self) -> int:
         return hash(f'{self.word},{self.language}')
@@ -41,46 +48,178 @@ class Word(BaseModel):
             data['date'] = datetime.fromtimestamp(
                 data['time_modified_ms'] / 1000
             )  # Convert milliseconds to seconds to datetime
+        context = data.get('context')
+        phrase = (context.get('phrase') or {}) if isinstance(context, dict) else {}  # LR's SavedWordContext
+        if 'media' not in data:
+            media = dict(
+                audio=data.get('audio'),
+                thumb_prev=phrase.get('thumb_prev'),
+                thumb_next=phrase.get('thumb_next'),
+            )
+            data['media'] = {kind: m['data_url'] for kind, m in media.items() if m and m.get('data_url')}
+        if isinstance(context, dict):
+            translations = phrase.get('h_translations') or phrase.get('m_translations') or {}
+            # '0' and '2' are the lines around it
+            data['context'] = (phrase.get('subtitles') or {}).get('1') or ''
+            data['translation'] = translations.get('1') or ''
         return data
 
 
-def import_words(cache_allowed: bool = True) -> set[Word]:
-    from polyglotka.importer import words_cache
-
-    migaku_files: list[Path] = Path(config.EXPORTED_FILES_DIR).glob(config.MGK_FILES_GLOB_PATTERN)
-    lr_files: list[Path] = Path(config.EXPORTED_FILES_DIR).glob(config.LR_FILES_GLOB_PATTERN)
-
-    # Try Chrome import if --chrome flag is set and no CSV files found
-    browser_migaku_items: list[MigakuItem] = []
-    if config.CHROME and not migaku_files:
-        from polyglotka.importer.migaku.browser import fetch_migaku_words_from_chrome
-
-        browser_migaku_items = list(fetch_migaku_words_from_chrome())
-
-    if not (migaku_files + lr_files) and not browser_migaku_items:
-        files_not_found = f'Neither LR files "{config.LR_FILES_GLOB_PATTERN}" nor Migaku files "{config.MGK_FILES_GLOB_PATTERN}" are found in directory: "{config.EXPORTED_FILES_DIR}"'
-
-        if not cache_allowed:
-            raise UserError(files_not_found)
-        if not config.CACHE_WORDS.exists():
-            raise UserError(f'{files_not_found}\n  Cache also not found: "{config.CACHE_WORDS}"')
-        pprint(f'{files_not_found}.\nUsing cache.')
-
-        return words_cache.read()
-
-    lr_items: list[LRSavedWord] = [i for i in import_lr_items(lr_files) if isinstance(i, LRSavedWord)]
-    migaku_items: list[MigakuItem] = list(import_migaku_items(migaku_files)) + browser_migaku_items
-    all_words: list[Word] = list(words_cache.read()) + [
-        Word(**item.model_dump()) for item in (migaku_items + lr_items)
-    ]
-
-    unique_words: set[Word] = set()
-    for word in sorted(all_words, key=lambda w: w.date):
-        unique_words.discard(word)  # Remove older occurrences
-        if word.learning_stage in (LearningStage.KNOWN, LearningStage.LEARNING):
-            unique_words.add(word)
+Occurrence = tuple[datetime, int, Word]  # Date, source priority, word
+
+
+def _keep_latest(occurrences: dict[tuple[str, str], Occurrence], occurrence: Occurrence) -> None:
+    key = (occurrence[2].language, occurrence[2].word)
+    if (kept := occurrences.get(key)) is None or occurrence[:2] >= kept[:2]:  # Later arrivals win ties
+        occurrences[key] = occurrence
+
+
+class WordMerge:
+    """Latest occurrence of each word, whatever order the sources deliver them in.
+
+    Equal dates go to the source with the higher priority. Migaku has no ranks, media and context,
+    so the latest occurrence takes them from the latest one that has them.
+    """
+
+    def __init__(self) -> None:
+        self.latest: dict[tuple[str, str], Occurrence] = {}
+        self.ranked: dict[tuple[str, str], Occurrence] = {}
+        self.with_media: dict[tuple[str, str], Occurrence] = {}
+        self.with_context: dict[tuple[str, str], Occurrence] = {}
+
+    def add(self, word: Word, priority: int) -> None:
+        occurrence = (word.date, priority, word)
+        _keep_latest(self.latest, occurrence)
+        if word.freq_rank is not None:
+            _keep_latest(self.ranked, occurrence)
+        if word.media:
+            _keep_latest(self.with_media, occurrence)
+        if word.context:
+            _keep_latest(self.with_context, occurrence)
+
+    def words(self) -> list[Word]:
+        words: list[Word] = []
+        for key, (_, _, word) in self.latest.items():
+            if word.freq_rank is None and (ranked := self.ranked.get(key)):
+                word.freq_rank, word.dioco_freq = ranked[2].freq_rank, ranked[2].dioco_freq
+            if not word.media and (with_media := self.with_media.get(key)):
+                word.media = with_media[2].media
+            if not word.context and (with_context := self.with_context.get(key)):
+                word.context, word.translation = with_context[2].context, with_context[2].translation
+            words.append(word)
+        return words
+
+
+# The languages (None for all) and words of the first import while sharing
+_shared_words: list[tuple[frozenset[str] | None, set[Word]]] | None = None
+
+
+@contextmanager
+def share_words() -> Iterator[None]:
+    """Import once and hand the same words to every later caller, e.g. the commands of `run`."""
+    global _shared_words
+    _shared_words = []
+    try:
+        yield
+    finally:
+        _shared_words = None
+
+
+def forget_shared_words() -> None:
+    if _shared_words:
+        _shared_words.clear()
+
+
+def import_words(cache_allowed: bool = True, langs: Iterable[str] | None = None) -> set[Word]:
+    """Import new files or read the cache, at once while it is younger than CACHE_TTL.
+
+    If `langs` are given, only they are read from the cache.
+    """
+    wanted = frozenset(langs) if langs is not None else None
+    if _shared_words and cache_allowed:  # The import command imports anyway
+        shared_langs, words = _shared_words[0]
+        if shared_langs is None or (wanted is not None and wanted <= shared_langs):
+            return words
+        wanted = None  # Read every language, so the next callers are covered too
+
+    from polyglotka.importer import freshness, words_cache
+
+    if cache_allowed and freshness.cache_first():
+        read_langs, words = wanted, words_cache.read(wanted)
+    else:
+        read_langs, words = _import_words(cache_allowed, wanted)
+    if _shared_words is not None:
+        _shared_words[:] = [(read_langs, words)]
+    return words
+
+
+@span('Importing words')
+@cache_lock()  # Held from globbing to removing the files, so concurrent imports neither race nor lose words
+def _import_words(
+    cache_allowed: bool, langs: frozenset[str] | None
+) -> tuple[frozenset[str] | None, set[Word]]:
+    """The languages read (None for all) and the words. Imported files bring all languages."""
+    from polyglotka.importer import freshness, lemmas, rollups, snapshots, words_cache
+    from polyglotka.importer.language_reactor.importer import load_item_versions, save_item_versions
+    from polyglotka.importer.sources import find_sources, stream_batches
+
+    # Valid only along with the cache they were merged into
+    lr_versions = load_item_versions() if words_cache.exists() else {}
+    sources = find_sources(lr_versions)
+    files: list[Path] = [file for source in sources for file in source.files]
+    files_not_found = (
+        f'Neither LR files "{config.LR_FILES_GLOB_PATTERN}" '
+        f'nor Migaku files "{config.MGK_FILES_GLOB_PATTERN}" '
+        f'are found in directory: "{config.EXPORTED_FILES_DIR}"'
+    )
+    if not files and not config.CHROME:
+        return langs, _read_cache_instead(files_not_found, cache_allowed, langs)
+
+    cached_words: set[Word] = set()
+    lr_saved_items: list[LRSavedItem] = []
+    imported_words = 0
+    merge = WordMerge()
+    with ValidationReport() as report:
+        for batch in stream_batches(sources, report):
+            match batch.source.name:
+                case 'cache':
+                    cached_words.update(batch.words)
+                case 'lr':
+                    lr_saved_items.extend(batch.items)
+            imported_words += len(batch.words) if batch.source.name != 'cache' else 0
+            with span('Merging words'):  # Per batch, so the producers' spans stay out of it
+                for word in batch.words:
+                    merge.add(word, batch.source.priority)
+
+    if not files and not imported_words:  # Chrome found nothing
+        return langs, _read_cache_instead(files_not_found, cache_allowed, langs)
+
+    unique_words: set[Word] = {
+        w for w in merge.words() if w.learning_stage in (LearningStage.KNOWN, LearningStage.LEARNING)
+    }
 
     words_cache.write(unique_words)
-    remove_files_maybe(lr_files + migaku_files)
-
-    return unique_words
+    freshness.mark_refreshed()
+    save_item_versions(lr_versions)
+    rollups.update(cached_words, unique_words)
+    snapshots.save(unique_words)
+    if lr_saved_items:
+        lemmas.update(lr_saved_items)
+    with span('Removing processed files'):
+        remove_files_maybe(files)
+
+    return None, unique_words
+
+
+def _read_cache_instead(files_not_found: str, cache_allowed: bool, langs: frozenset[str] | None) -> set[Word]:
+    from polyglotka.importer import freshness, words_cache
+
+    if words_cache.exists():
+        freshness.mark_refreshed()  # Nothing new, the cache is as fresh as it gets
+    if not cache_allowed:
+        raise UserError(files_not_found)
+    if not words_cache.exists():
+        raise UserError(f'{files_not_found}\n  Cache also not found: "{config.CACHE_WORDS}"')
+    pprint(f'{files_not_found}.\nUsing cache.')
+
+    return words_cache.read(langs)
@@ -1,34 +1,155 @@
+"""Cached words, one file per language, and a manifest of what every file holds.
+
+Commands that need a single language read only its file, and `info` reads only the manifest.
+Language files are named by a hash of their contents, so unchanged languages are not rewritten,
+and the manifest is replaced last, so readers always find the files it lists.
+"""
+
+import hashlib
 import json
+from datetime import datetime
+from itertools import groupby
+from typing import Iterable
 
+from path import Path
+from pydantic import BaseModel
+
+from polyglotka.common import metrics
 from polyglotka.common.config import config
 from polyglotka.common.console import pprint
-from polyglotka.importer.words import Word
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import cache_lock, write_text_atomic
+from polyglotka.importer.words import LearningStage, Word
 from polyglotka.simple_commands.words_exporter import save_anki_known_morphs
 
+MANIFEST_NAME = 'manifest.json'
+LEGACY_NAME = 'words.json'  # A single file with every language, read until the next import
+
+
+class Partition(BaseModel):
+    file: str
+    count: int
+    stages: dict[LearningStage, int]
+    first_date: datetime
+    last_date: datetime
+
+
+class Manifest(BaseModel):
+    partitions: dict[str, Partition] = {}  # By language
+
+
+def _manifest_file() -> Path:
+    return config.CACHE_WORDS / MANIFEST_NAME
+
+
+def _legacy_file() -> Path:
+    return config.CACHE_DIR / LEGACY_NAME
+
+
+def exists() -> bool:
+    return _manifest_file().exists() or _legacy_file().exists()
+
+
+def mtime() -> float | None:
+    """Changes only when an import changes the words."""
+    for file in (_manifest_file(), _legacy_file()):
+        if file.exists():
+            return file.getmtime()
+    return None
 
-def read() -> set[Word]:
-    from polyglotka.importer.words import Word
 
-    if config.CACHE_WORDS.exists():
-        return {Word.model_validate(word) for word in json.loads(config.CACHE_WORDS.read_text())}
-    return set()
+def read_manifest() -> Manifest | None:
+    if not _manifest_file().exists():
+        return None
+    return Manifest.model_validate_json(_manifest_file().read_text())
 
 
+def languages() -> list[str]:
+    return sorted(manifest.partitions) if (manifest := read_manifest()) else []
+
+
+def _decode(text: str) -> set[Word]:
+    with span('Decoding cache JSON'):
+        cached_words = json.loads(text)
+    with span('Validating cached words'):
+        return {Word.model_validate(word) for word in cached_words}
+
+
+def _read_partitions(manifest: Manifest, langs: Iterable[str] | None) -> set[Word]:
+    words: set[Word] = set()
+    for lang in manifest.partitions if langs is None else langs:
+        if partition := manifest.partitions.get(lang):
+            file = config.CACHE_WORDS / partition.file
+            words.update(_decode(file.read_text()))
+            metrics.add('read_bytes', file.getsize(), source='cache')
+    return words
+
+
+@span('Reading cache')
+def read(langs: Iterable[str] | None = None) -> set[Word]:
+    """Cached words of these languages, or of all of them."""
+    if (manifest := read_manifest()) is None:
+        if not _legacy_file().exists():
+            return set()
+        words = _decode(_legacy_file().read_text())
+        return words if langs is None else {w for w in words if w.language in set(langs)}
+
+    try:
+        return _read_partitions(manifest, langs)
+    except FileNotFoundError:
+        # Removed by an import that finished meanwhile, its manifest is already in place
+        return _read_partitions(read_manifest() or Manifest(), langs)
+
+
+def _dump(words: list[Word]) -> str:
+    return json.dumps([word.model_dump(mode='json') for word in words], indent=2, ensure_ascii=False)
+
+
+@span('Writing cache')
 def write(words: set[Word]) -> None:
-    config.CACHE_WORDS.write_text(
-        json.dumps(
-            [json.loads(word.model_dump_json()) for word in words],
-            indent=2,
-            ensure_ascii=False,
+    config.CACHE_WORDS.makedirs_p()
+    manifest = Manifest()
+
+    # Sorted, so unchanged languages hash the same and keep their files
+    sorted_words = sorted(words, key=lambda w: (w.language, w.date, w.word))
+    for lang, lang_words in groupby(sorted_words, key=lambda w: w.language):
+        lang_words = list(lang_words)
+        text = _dump(lang_words)
+        file = f'{lang}.{hashlib.sha1(text.encode()).hexdigest()[:12]}.json'
+        if not (config.CACHE_WORDS / file).exists():
+            write_text_atomic(config.CACHE_WORDS / file, text)
+
+        stages = {stage: 0 for stage in (LearningStage.KNOWN, LearningStage.LEARNING)}
+        for word in lang_words:
+            stages[word.learning_stage] = stages.get(word.learning_stage, 0) + 1
+        manifest.partitions[lang] = Partition(
+            file=file,
+            count=len(lang_words),
+            stages=stages,
+            first_date=lang_words[0].date,
+            last_date=lang_words[-1].date,
         )
+
+    write_text_atomic(_manifest_file(), manifest.model_dump_json(indent=2))
+    # Files derived from a language file, like its search index, share its name and go with it
+    kept_prefixes = tuple(
+        partition.file.removesuffix('.json') + '.' for partition in manifest.partitions.values()
     )
+    for file in config.CACHE_WORDS.files():
+        if file.name != MANIFEST_NAME and not file.name.startswith(kept_prefixes):
+            file.remove_p()
+    _legacy_file().remove_p()
     pprint(f'Cached {len(words)} words.')
 
     if config.KNOWN_MORPHS_SAVE_LANGS:
-        for lang in config.KNOWN_MORPHS_SAVE_LANGS.lower().split(','):
-            save_anki_known_morphs(lang, words)
+        with span('Saving known morphs'):
+            save_anki_known_morphs(config.KNOWN_MORPHS_SAVE_LANGS.lower().split(','), words)
 
 
 def clear() -> None:
-    config.CACHE_WORDS.remove_p()
+    with cache_lock():
+        for cache_path in config.cache_paths.values():
+            if cache_path != config.CACHE_LOCK:  # Other processes may be waiting on it
+                cache_path.rmtree_p() if cache_path.is_dir() else cache_path.remove_p()
+        _legacy_file().remove_p()
     pprint(f'Cache is cleared.')
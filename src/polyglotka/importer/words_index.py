@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+from polyglotka.importer.words import LearningStage, Word
+
+STAGES: list[LearningStage] = list(LearningStage)
+
+
+def import_pyarrow() -> Any:
+    try:
+        import pyarrow  # pyright: ignore
+
+        return pyarrow
+    except ImportError:
+        raise UserError(
+            'pyarrow is not installed. Reinstall polyglotka with the "arrow" extra: polyglotka[arrow]'
+        )
+
+
+def to_datetime64(value: datetime | str) -> np.datetime64:
+    try:
+        return np.datetime64(pd.Timestamp(value).to_datetime64(), 'us')
+    except ValueError:
+        raise UserError(f'Invalid date: {repr(value)}')
+
+
+class WordIndex:
+    """Columnar, date-sorted copy of the words with secondary indexes on language and stage.
+
+    Row ids are positions in the date-sorted columns, so every posting list is sorted
+    by date too, and a date range is a contiguous slice of row ids.
+    """
+
+    @span('Building word index')
+    def __init__(self, words: Iterable[Word]) -> None:
+        sorted_words: list[Word] = sorted(words, key=lambda w: w.date)
+
+        self.words: np.ndarray = np.array([w.word for w in sorted_words], dtype=object)
+        self.dates: np.ndarray = np.array([w.date for w in sorted_words], dtype='datetime64[us]')
+        self.language_names: list[str] = sorted({w.language for w in sorted_words})
+        self.language_codes: np.ndarray = np.searchsorted(
+            self.language_names, [w.language for w in sorted_words]
+        ).astype(np.int16)
+        self.stage_codes: np.ndarray = np.array(
+            [STAGES.index(w.learning_stage) for w in sorted_words], dtype=np.int8
+        )
+
+        self.by_language: dict[str, np.ndarray] = {
+            lang: np.flatnonzero(self.language_codes == code) for code, lang in enumerate(self.language_names)
+        }
+        self.by_stage: dict[LearningStage, np.ndarray] = {
+            stage: np.flatnonzero(self.stage_codes == code) for code, stage in enumerate(STAGES)
+        }
+        self.by_language_stage: dict[tuple[str, LearningStage], np.ndarray] = {
+            (lang, stage): np.intersect1d(lang_rows, stage_rows, assume_unique=True)
+            for lang, lang_rows in self.by_language.items()
+            for stage, stage_rows in self.by_stage.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def date_range(self, since: datetime | str | None = None, until: datetime | str | None = None) -> slice:
+        """Rows dated within [since, until], found by binary search."""
+        start = np.searchsorted(self.dates, to_datetime64(since), 'left') if since is not None else 0
+        stop = np.searchsorted(self.dates, to_datetime64(until), 'right') if until is not None else len(self)
+        return slice(int(start), int(stop))
+
+    def rows(
+        self,
+        lang: str = '',
+        stage: str = '',
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        contains: str = '',
+    ) -> np.ndarray:
+        """Sorted row ids matching every given filter."""
+        date_range = self.date_range(since, until)
+        rows: np.ndarray | None = None
+
+        if lang and lang not in self.by_language:
+            raise UserError(f'LANG must be one of {tuple(self.language_names)}, not this: {repr(lang)}')
+        try:
+            learning_stage = LearningStage(stage.upper()) if stage else None
+        except ValueError:
+            raise UserError(f'STAGE must be one of {tuple(STAGES)}, not this: {repr(stage)}')
+
+        if lang and learning_stage:
+            rows = self.by_language_stage[(lang, learning_stage)]
+        elif lang:
+            rows = self.by_language[lang]
+        elif learning_stage:
+            rows = self.by_stage[learning_stage]
+
+        if rows is None:
+            rows = np.arange(date_range.start, date_range.stop)
+        else:
+            rows = rows[np.searchsorted(rows, date_range.start) : np.searchsorted(rows, date_range.stop)]
+
+        if contains:
+            rows = rows[
+                pd.Series(self.words[rows], dtype=object).str.contains(contains, regex=False).to_numpy()
+            ]
+        return rows
+
+    def to_frame(self, rows: np.ndarray | slice = slice(None)) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                'word': self.words[rows],
+                'language': pd.Categorical.from_codes(self.language_codes[rows], self.language_names),
+                'learning_stage': pd.Categorical.from_codes(self.stage_codes[rows], [str(s) for s in STAGES]),
+                'date': self.dates[rows],
+            }
+        )
+
+    def to_arrow(self, rows: np.ndarray | slice = slice(None)) -> Any:
+        pa = import_pyarrow()
+
+        return pa.table(
+            {
+                'word': pa.array(self.words[rows], type=pa.string()),
+                'language': pa.DictionaryArray.from_arrays(
+                    self.language_codes[rows], pa.array(self.language_names, type=pa.string())
+                ),
+                'learning_stage': pa.DictionaryArray.from_arrays(
+                    self.stage_codes[rows], pa.array([str(s) for s in STAGES], type=pa.string())
+                ),
+                'date': pa.array(self.dates[rows]),
+            }
+        )
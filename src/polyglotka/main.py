@@ -1,17 +1,30 @@
+import shlex
 import sys
+from contextlib import nullcontext
 from enum import StrEnum, auto
-from typing import Any
+from typing import Any, Iterable
 
 import fire  # type: ignore
-import icecream
+from fire.parser import DefaultParseValue  # type: ignore
 
+from polyglotka.common import metrics, profiling
 from polyglotka.common.config import config
 from polyglotka.common.exceptions import UserError
+from polyglotka.common.utils import output_to_file
 from polyglotka.importer import words_cache
-from polyglotka.importer.words import import_words
+from polyglotka.importer.words import forget_shared_words, import_words, share_words
 from polyglotka.plots.main import main as plots_main
+from polyglotka.server import main as server_main
+from polyglotka.simple_commands.apkg import main as apkg_main
+from polyglotka.simple_commands.batch import main as batch_main
+from polyglotka.simple_commands.coverage import main as coverage_main
+from polyglotka.simple_commands.diff import main as diff_main
 from polyglotka.simple_commands.excel_to_srt import main as excel_to_srt_main
+from polyglotka.simple_commands.export import main as export_main
+from polyglotka.simple_commands.info import main as info_main
 from polyglotka.simple_commands.kanji import main as kanji_main
+from polyglotka.simple_commands.lemmas import main as lemmas_main
+from polyglotka.simple_commands.stats import main as stats_main
 from polyglotka.simple_commands.words_exporter import print_words
 
 
@@ -21,21 +34,31 @@ class Command(StrEnum):
     KANJI = auto()
     ANKI = auto()
     WORDS = auto()
+    STATS = auto()
+    LEMMAS = auto()
+    COVERAGE = auto()
+    DIFF = auto()
+    EXPORT = auto()
+    APKG = auto()
     SUBS = auto()
     CLEAR_CACHE = 'clear-cache'
     IMPORT = auto()
+    BATCH = auto()
+    RUN = auto()
+    SERVE = auto()
 
 
-def entrypoint(command: Command, **config_upd: Any) -> None:
+def check_command(command: str) -> None:
     if command not in list(Command):
         raise UserError(
             f'Command "{command}" does not exist. Available commands: \n  - ' + '\n  - '.join(Command)
         )
-    config.override(config_upd)
 
+
+def execute(command: Command) -> None:
     match command:
         case Command.INFO:
-            icecream.ic(config.model_dump())
+            info_main()
         case Command.PLOTS:
             plots_main()
         case Command.KANJI:
@@ -44,12 +67,73 @@ def entrypoint(command: Command, **config_upd: Any) -> None:
             kanji_main(anki=True)
         case Command.WORDS:
             print_words()
+        case Command.STATS:
+            stats_main()
+        case Command.LEMMAS:
+            lemmas_main()
+        case Command.COVERAGE:
+            coverage_main()
+        case Command.DIFF:
+            diff_main()
+        case Command.EXPORT:
+            export_main()
+        case Command.APKG:
+            apkg_main()
         case Command.IMPORT:
             import_words(cache_allowed=False)
+        case Command.BATCH:
+            batch_main()
         case Command.SUBS:
             excel_to_srt_main()
         case Command.CLEAR_CACHE:
             words_cache.clear()
+            forget_shared_words()
+        case Command.SERVE:
+            server_main()
+        case Command.RUN:
+            raise UserError('Commands of "run" cannot be "run"')
+
+
+def parse_command(command_line: str) -> tuple[str, dict[str, Any]]:
+    """Split "words --lang ja --output ja.txt" into the command and its overrides, parsed like Fire does."""
+    command, *args = shlex.split(command_line) or ['']
+    config_upd: dict[str, Any] = {}
+    while args:
+        arg = args.pop(0)
+        if not arg.startswith('--'):
+            raise UserError(f'Expected a flag in "{command_line}", not this: {repr(arg)}')
+        name, has_value, value = arg.removeprefix('--').partition('=')
+        if not has_value:
+            value = args.pop(0) if args and not args[0].startswith('--') else 'True'
+        config_upd[name.replace('-', '_')] = DefaultParseValue(value)
+    return command, config_upd
+
+
+def run(command_lines: Iterable[str]) -> None:
+    """Run several commands in one process. They import words once and share them."""
+    with share_words():
+        for command_line in command_lines:
+            command, config_upd = parse_command(command_line)
+            check_command(command)
+            with config.restored_after():
+                config.override(config_upd)
+                # Without its own OUTPUT, a command writes where the whole run does
+                own_output = 'OUTPUT' in map(str.upper, config_upd)
+                with profiling.span(command_line), output_to_file() if own_output else nullcontext():
+                    execute(Command(command))
+
+
+def entrypoint(command: Command, *command_lines: str, **config_upd: Any) -> None:
+    check_command(command)
+    if command_lines and command != Command.RUN:
+        raise UserError(f'Unexpected arguments: {" ".join(command_lines)}')
+    config.override(config_upd)
+
+    with profiling.profile(command), metrics.collect(command), output_to_file():
+        if command == Command.RUN:
+            run(command_lines)
+        else:
+            execute(command)
 
 
 def main() -> None:
@@ -118,6 +118,9 @@ def configure_figure(fig: go.Figure, traces: list[go.Scatter]) -> None:
         )
 
 
+GRAPH_ID = 'graph'
+
+
 def create_dash_app(figure: go.Figure) -> dash.Dash:
     """Needed for margins to match the background color."""
     app = dash.Dash()
@@ -134,7 +137,7 @@ def create_dash_app(figure: go.Figure) -> dash.Dash:
         </html>
     """
     app.layout = dash.html.Div(
-        children=[dash.dcc.Graph(figure=figure, style={'height': '100vh'})],
+        children=[dash.dcc.Graph(id=GRAPH_ID, figure=figure, style={'height': '100vh'})],
     )
 
     return app
@@ -0,0 +1,133 @@
+"""The words behind a click or a selection on the plots, one page at a time."""
+
+from datetime import timedelta
+from typing import Any, Callable
+
+import dash
+import pandas as pd
+import plotly.graph_objects as go  # pyright: ignore
+from dash import Input, Output, State, dash_table
+
+from polyglotka.common.config import config
+from polyglotka.importer.words_index import STAGES, WordIndex
+from polyglotka.plots.appearance import GRAPH_ID
+from polyglotka.plots.figure import ALL
+
+TABLE_ID = 'drill-down-table'
+SUMMARY_ID = 'drill-down-summary'
+SELECTION_ID = 'drill-down-selection'
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+
+
+def trace_filters(figure: go.Figure) -> list[dict[str, str]]:
+    """Language and stage filters of every trace, by curve number. ALL filters nothing."""
+    filters: list[dict[str, str]] = []
+    for trace in figure.data:  # pyright: ignore
+        meta = trace.meta or {}  # pyright: ignore
+        filters.append({key: '' if meta.get(key, ALL) == ALL else meta[key] for key in ('language', 'stage')})
+    return filters
+
+
+def select(
+    data: dict[str, Any] | None, clicked: bool, selection: dict[str, Any], filters: list[dict[str, str]]
+) -> dict[str, Any]:
+    """A click picks a day, a box selection picks its time range. A single line picks its filters too."""
+    points: list[dict[str, Any]] = (data or {}).get('points', [])
+
+    if clicked and points:
+        day = pd.Timestamp(points[0]['x']).normalize()
+        since, until = day, day + timedelta(days=1) - timedelta(microseconds=1)
+    elif data and 'range' in data:
+        since, until = map(pd.Timestamp, sorted(data['range']['x']))
+    else:
+        return selection
+
+    curves = {point['curveNumber'] for point in points}
+    trace_filter = filters[curves.pop()] if len(curves) == 1 else selection['filter']
+    return dict(filter=trace_filter, since=since.isoformat(), until=until.isoformat())
+
+
+def add_drill_down(app: dash.Dash, load: Callable[[], tuple[go.Figure, WordIndex]]) -> None:
+    """`load` returns the full figure and its index, waiting for them if they are still being built."""
+    app.layout.children.extend(  # pyright: ignore
+        [
+            dash.dcc.Store(
+                id=SELECTION_ID, data=dict(filter=dict(language='', stage=''), since=None, until=None)
+            ),
+            dash.html.Div(
+                id=SUMMARY_ID,
+                children='Click a line or select a range to see the words behind it.',
+                style=dict(color='white', fontSize=20, margin='0 120px 10px'),
+            ),
+            dash.html.Div(
+                dash_table.DataTable(
+                    id=TABLE_ID,
+                    columns=[
+                        dict(name=name.capitalize(), id=name)
+                        for name in ('date', 'language', 'stage', 'word')
+                    ],
+                    # Pages are cut on the server, the browser never gets the whole range
+                    page_action='custom',
+                    page_current=0,
+                    page_size=config.PLOTS_PAGE_SIZE,
+                    page_count=0,
+                    style_header=dict(backgroundColor='#333', color='white', fontWeight='bold'),
+                    style_cell=dict(
+                        backgroundColor=config.PLOTS_BACKGROUND_COLOR,
+                        color='white',
+                        textAlign='left',
+                        fontSize=16,
+                    ),
+                ),
+                style=dict(margin='0 120px 60px'),
+            ),
+        ]
+    )
+
+    @app.callback(
+        Output(SELECTION_ID, 'data'),
+        Output(TABLE_ID, 'page_current'),
+        Input(GRAPH_ID, 'clickData'),
+        Input(GRAPH_ID, 'selectedData'),
+        State(SELECTION_ID, 'data'),
+        prevent_initial_call=True,
+    )
+    def _select(  # pyright: ignore
+        click_data: dict[str, Any] | None, selected_data: dict[str, Any] | None, selection: dict[str, Any]
+    ) -> tuple[dict[str, Any], int]:
+        clicked = f'{GRAPH_ID}.clickData' in dash.ctx.triggered_prop_ids
+        filters = trace_filters(load()[0])  # The preview has the same traces in the same order
+        return select(click_data if clicked else selected_data, clicked, selection, filters), 0
+
+    @app.callback(
+        Output(TABLE_ID, 'data'),
+        Output(TABLE_ID, 'page_count'),
+        Output(SUMMARY_ID, 'children'),
+        Input(SELECTION_ID, 'data'),
+        Input(TABLE_ID, 'page_current'),
+        prevent_initial_call=True,
+    )
+    def _show_page(  # pyright: ignore
+        selection: dict[str, Any], page_current: int
+    ) -> tuple[list[dict[str, str]], int, str]:
+        trace_filter = selection['filter']
+        index = load()[1]
+        # Binary searches on date-sorted posting lists, whatever the number of words
+        rows = index.rows(
+            trace_filter['language'], trace_filter['stage'], selection['since'], selection['until']
+        )
+        page_rows = rows[page_current * config.PLOTS_PAGE_SIZE : (page_current + 1) * config.PLOTS_PAGE_SIZE]
+
+        page = [
+            dict(
+                date=pd.Timestamp(index.dates[row]).strftime(DATE_FORMAT),
+                language=index.language_names[index.language_codes[row]],
+                stage=str(STAGES[index.stage_codes[row]]),
+                word=index.words[row],
+            )
+            for row in page_rows
+        ]
+        since, until = (pd.Timestamp(selection[key]).strftime(DATE_FORMAT) for key in ('since', 'until'))
+        name = ' - '.join(value.upper() or ALL for value in trace_filter.values())
+        summary = f'{name}, {since} to {until}: {len(rows):,} words'
+        return page, -(-len(rows) // config.PLOTS_PAGE_SIZE), summary
@@ -1,13 +1,15 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Iterable
+from typing import Any, Iterable
 
-import icecream
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go  # pyright: ignore
 from funcy import pluck_attr  # pyright: ignore
 
 from polyglotka.common.config import config
+from polyglotka.common.profiling import span
+from polyglotka.importer.rollups import Bucket
 from polyglotka.importer.words import LearningStage, Word
 from polyglotka.plots.appearance import configure_figure, get_color
 
@@ -29,12 +31,19 @@ class WordDicts:
                 self.by_lang_stage[(word.language, word.learning_stage)].add(word)
 
             if config.PLOTS_AGGREGATE:
-                icecream.ic()
                 self.by_lang[word.language].add(word)
                 if word.learning_stage in config.plots_learning_stages:
                     self.by_stage[word.learning_stage].add(word)
 
+    def get(self, language: str, learning_stage: str) -> set[Word]:
+        if language == ALL:
+            return self.all_words if learning_stage == ALL else self.by_stage[LearningStage(learning_stage)]
+        if learning_stage == ALL:
+            return self.by_lang[language]
+        return self.by_lang_stage[(language, LearningStage(learning_stage))]
 
+
+@span('Creating points')
 def create_points(words: Iterable[Word]) -> tuple[list[datetime], list[int]]:
     word_dates: list[datetime] = sorted(pluck_attr('date', words))
     # Start 1 hour before first word to show initial bursts as vertical jumps
@@ -44,7 +53,8 @@ def create_points(words: Iterable[Word]) -> tuple[list[datetime], list[int]]:
         start + timedelta(hours=i) for i in range(int((end - start).total_seconds() // 3600) + 1)
     ]
     x_data: list[datetime] = sorted(set(word_dates + hourly_points))
-    y_data: list[int] = [sum(1 for wd in word_dates if wd <= x) for x in x_data]
+    # Words dated up to each point, by binary search
+    y_data: list[int] = pd.DatetimeIndex(word_dates).searchsorted(x_data, side='right').tolist()
 
     if config.PLOTS_SMOOTH:
         series = pd.Series(y_data, index=pd.to_datetime(x_data)).sort_index()
@@ -79,16 +89,7 @@ def create_points(words: Iterable[Word]) -> tuple[list[datetime], list[int]]:
     return x_data, y_data  # type: ignore
 
 
-def create_trace(
-    language: str,
-    learning_stage: str,
-    words: Iterable[Word],
-) -> go.Scatter:
-    words = list(words)
-    if not words:
-        return go.Scatter(name='')
-
-    x_data, y_data = create_points(words)
+def create_scatter(language: str, learning_stage: str, x_data: Any, y_data: Any) -> go.Scatter:
     name = f'{language.upper()} - {learning_stage.capitalize()}'
 
     line_width = 3
@@ -107,52 +108,82 @@ def create_trace(
             width=line_width,
         ),
         visible=True,
+        meta=dict(language=language, stage=learning_stage),  # For the drill-down
     )
 
 
-def create_figure(words: Iterable[Word]) -> go.Figure:
-    wds = WordDicts(words)
-    fig: go.Figure = go.Figure()
-    languages, stages = map(set, zip(*wds.by_lang_stage.keys()))
-    traces: list[go.Scatter] = []
+def create_trace(
+    language: str,
+    learning_stage: str,
+    words: Iterable[Word],
+) -> go.Scatter:
+    words = list(words)
+    if not words:
+        return go.Scatter(name='')
+
+    return create_scatter(language, learning_stage, *create_points(words))
+
+
+def trace_keys(lang_stages: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """(language, stage) of every trace, ALL for the aggregates."""
+    if not (lang_stages := list(lang_stages)):
+        return []
+    languages, stages = map(set, zip(*lang_stages))
+    keys: list[tuple[str, str]] = []
 
     for lang in languages:
-        for stage in stages:
-            traces.append(
-                create_trace(
-                    lang,
-                    stage,
-                    wds.by_lang_stage[(lang, stage)],
-                )
-            )
+        keys.extend((lang, stage) for stage in stages)
         if config.PLOTS_AGGREGATE:
-            traces.append(
-                create_trace(
-                    lang,
-                    ALL,
-                    wds.by_lang[lang],
-                )
-            )
+            keys.append((lang, ALL))
 
     if config.PLOTS_AGGREGATE:
-        for stage in stages:
-            traces.append(
-                create_trace(
-                    ALL,
-                    stage,
-                    wds.by_stage[stage],
-                )
-            )
-        traces.append(
-            create_trace(
-                ALL,
-                ALL,
-                wds.all_words,
-            )
-        )
+        keys.extend((ALL, stage) for stage in stages)
+        keys.append((ALL, ALL))
+    return keys
+
 
+def assemble_figure(traces: list[go.Scatter]) -> go.Figure:
+    fig: go.Figure = go.Figure()
     for trace in sorted(traces, key=lambda t: t.name):  # pyright: ignore
         fig.add_trace(trace)  # pyright: ignore
 
-    configure_figure(fig, traces)
+    with span('Configuring figure'):
+        configure_figure(fig, traces)
     return fig
+
+
+@span('Building figure')
+def create_figure(words: Iterable[Word]) -> go.Figure:
+    with span('Grouping words'):
+        wds = WordDicts(words)
+    return assemble_figure(
+        [create_trace(lang, stage, wds.get(lang, stage)) for lang, stage in trace_keys(wds.by_lang_stage)]
+    )
+
+
+@span('Building preview figure')
+def create_preview_figure(rollups: Counter[Bucket]) -> go.Figure:
+    """The same traces with a point per day, from the rollups alone.
+
+    Coarse, but ready before any word is read.
+    """
+    days: defaultdict[tuple[str, str], Counter[str]] = defaultdict(Counter)
+    for (lang, stage, day), count in rollups.items():
+        plotted_stage = LearningStage(stage) in config.plots_learning_stages
+        if plotted_stage:
+            days[(lang, stage)][day] += count
+        if config.PLOTS_AGGREGATE:
+            days[(lang, ALL)][day] += count
+            days[(ALL, ALL)][day] += count
+            if plotted_stage:
+                days[(ALL, stage)][day] += count
+
+    traces: list[go.Scatter] = []
+    for lang, stage in trace_keys(key for key in days if ALL not in key):
+        counts = sorted((day, count) for day, count in days[(lang, stage)].items() if count)
+        if not counts:
+            traces.append(go.Scatter(name=''))
+            continue
+        x_data = pd.to_datetime([day for day, _ in counts])
+        traces.append(create_scatter(lang, stage, x_data, np.cumsum([count for _, count in counts]).tolist()))
+    return assemble_figure(traces)
@@ -3,36 +3,67 @@ import os
 import threading
 import time
 import webbrowser
-from typing import NoReturn
 from urllib.parse import urlparse
 
 import dash
 import waitress
 
+from polyglotka.common import metrics, profiling
 from polyglotka.common.config import config
 from polyglotka.common.console import Progress, ProgressType
+from polyglotka.importer import rollups
 from polyglotka.importer.words import import_words
+from polyglotka.importer.words_index import WordIndex
 from polyglotka.plots.appearance import create_dash_app
-from polyglotka.plots.figure import create_figure
+from polyglotka.plots.drill_down import add_drill_down
+from polyglotka.plots.figure import create_figure, create_preview_figure
+from polyglotka.plots.progressive import Plots, rollups_fingerprint
+from polyglotka.plots.serving import serve_compressed, words_fingerprint
 
 # Silence the waitress queue depth warnings
 logging.getLogger('waitress.queue').setLevel(logging.ERROR)
 
+DELIVERY_TIMEOUT_SECONDS = 600  # A closed tab never fetches the full figure
+
 
 def main() -> None:
-    def _open_browser_and_die(progress: Progress) -> NoReturn:
+    def _open_browser_and_die(progress: Progress) -> None:
         time.sleep(0.3)
         webbrowser.open(config.PLOTS_SERVER_URL)
 
+        if config.PLOTS_SERVER_KEEP_ALIVE:
+            progress.update(f'Serving {config.PLOTS_SERVER_URL}, press Ctrl+C to stop')
+            return
+
+        if progressive:
+            progress.update('Plotting in full resolution')
+            plots.delivered.wait(DELIVERY_TIMEOUT_SECONDS)
         progress.update('Exiting')
         time.sleep(2)
         progress.__exit__(None, None, None)
         os._exit(0)
 
-    words = import_words()
+    # With rollups, the browser gets a daily preview at once and the full figure when it's built
+    progressive = bool(preview_rollups := rollups.read())
     with Progress(progress_type=ProgressType.TEXT, text='Plotting') as progress:
-        figure = create_figure(words)
-        dash_app: dash.Dash = create_dash_app(figure)
+        if progressive:
+            plots = Plots(create_preview_figure(preview_rollups), rollups_fingerprint(preview_rollups))
+        else:
+            words = import_words()
+            figure, fingerprint = create_figure(words), words_fingerprint(words)
+            plots = Plots(figure, fingerprint)
+            plots.finish(figure, WordIndex(words) if config.PLOTS_SERVER_KEEP_ALIVE else None, fingerprint)
+
+        with profiling.span('Creating Dash app'):
+            dash_app: dash.Dash = create_dash_app(plots.figure)
+            if config.PLOTS_SERVER_KEEP_ALIVE:  # Callbacks need the server
+                add_drill_down(dash_app, plots.wait)
+            serve_compressed(dash_app.server, lambda: plots.fingerprint)
+            if progressive:
+                plots.build_in_background(dash_app)
+        if not progressive:
+            profiling.report()  # The server never returns
+        metrics.save()  # Saved again once the full figure is built
 
         progress.update('Opening browser')
         threading.Thread(target=_open_browser_and_die, kwargs=dict(progress=progress), daemon=True).start()
@@ -40,4 +71,5 @@ def main() -> None:
             app=dash_app.server,
             host=urlparse(config.PLOTS_SERVER_URL).hostname,
             port=urlparse(config.PLOTS_SERVER_URL).port,
+            threads=config.PLOTS_SERVER_THREADS,
         )
@@ -0,0 +1,92 @@
+"""Show a preview from the daily rollups at once, swap in the full-resolution figure once it's built."""
+
+import contextvars
+import hashlib
+import os
+import sys
+import threading
+import traceback
+from collections import Counter
+
+import dash
+import plotly.graph_objects as go  # pyright: ignore
+from dash import Input, Output
+
+from polyglotka.common import metrics, profiling
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer.rollups import Bucket
+from polyglotka.importer.words import import_words
+from polyglotka.importer.words_index import WordIndex
+from polyglotka.plots.appearance import GRAPH_ID
+from polyglotka.plots.figure import create_figure
+from polyglotka.plots.serving import words_fingerprint
+
+POLL_ID = 'full-figure-poll'
+POLL_INTERVAL_MS = 500
+
+
+def rollups_fingerprint(rollups: Counter[Bucket]) -> str:
+    plots_config = {k: v for k, v in config.model_dump().items() if k.startswith('PLOTS_')}
+    return hashlib.sha256(
+        f'preview{sorted(rollups.items())}{sorted(plots_config.items())}'.encode()
+    ).hexdigest()
+
+
+class Plots:
+    """The figure served to the browser: the preview until the full one is ready."""
+
+    def __init__(self, figure: go.Figure, fingerprint: str) -> None:
+        self.figure = figure
+        self.fingerprint = fingerprint
+        self.index: WordIndex | None = None
+        self.ready = threading.Event()
+        self.delivered = threading.Event()  # The browser has the full figure
+
+    def finish(self, figure: go.Figure, index: WordIndex | None, fingerprint: str) -> None:
+        self.figure, self.index, self.fingerprint = figure, index, fingerprint
+        self.ready.set()
+
+    def wait(self) -> tuple[go.Figure, WordIndex]:
+        """The full figure and its index. Blocks the calling request until they are built."""
+        self.ready.wait()
+        assert self.index is not None
+        return self.figure, self.index
+
+    def build_in_background(self, app: dash.Dash) -> None:
+        def build() -> None:
+            try:
+                words = import_words()
+                figure = create_figure(words)
+                index = WordIndex(words) if config.PLOTS_SERVER_KEEP_ALIVE else None
+                with profiling.span('Fingerprinting words'):
+                    fingerprint = words_fingerprint(words)
+            except BaseException as exc:  # The server can't show anything better than the preview
+                print(exc if isinstance(exc, UserError) else traceback.format_exc(), file=sys.stderr)
+                os._exit(1)
+
+            # Reloads get the full figure without polling. Swapped before the fingerprint changes, see serving
+            graph.figure, poll.disabled = figure, True
+            self.finish(figure, index, fingerprint)
+            profiling.report()
+            metrics.save()
+
+        graph = app.layout[GRAPH_ID]  # pyright: ignore
+        poll = dash.dcc.Interval(id=POLL_ID, interval=POLL_INTERVAL_MS)
+        app.layout.children.append(poll)  # pyright: ignore
+
+        @app.callback(
+            Output(GRAPH_ID, 'figure'),
+            Output(POLL_ID, 'disabled'),
+            Input(POLL_ID, 'n_intervals'),
+            prevent_initial_call=True,
+        )
+        def _swap(_: int | None) -> tuple[go.Figure, bool]:  # pyright: ignore
+            if not self.ready.is_set():
+                raise dash.exceptions.PreventUpdate
+            self.delivered.set()
+            return self.figure, True
+
+        # Spans of the build nest under the plots command
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(build,), daemon=True)
+        thread.start()
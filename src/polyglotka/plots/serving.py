@@ -0,0 +1,112 @@
+"""Precompressed responses with strong ETags for the plots server."""
+
+import gzip
+import hashlib
+import re
+import threading
+from typing import Callable, Iterable
+
+import flask
+
+from polyglotka.common.config import config
+from polyglotka.importer.words import Word
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/javascript',
+    'application/json',
+    'text/css',
+    'text/html',
+    'text/javascript',
+}
+MIN_COMPRESSED_SIZE = 1024
+SCRIPT_SRC_PATTERN = re.compile(r'src="(/_dash-component-suites/[^"]+)"')
+
+
+def _brotli_compress() -> Callable[[bytes], bytes] | None:
+    try:
+        import brotli  # pyright: ignore
+    except ImportError:
+        return None
+    return lambda data: brotli.compress(data, quality=9)  # pyright: ignore
+
+
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {'gzip': lambda data: gzip.compress(data, compresslevel=9)}
+if brotli_compress := _brotli_compress():
+    COMPRESSORS = {'br': brotli_compress} | COMPRESSORS  # Preferred when the browser accepts both
+
+
+def words_fingerprint(words: Iterable[Word]) -> str:
+    """Changes whenever the words or the plots config change, and only then."""
+    digest = hashlib.sha256()
+    for line in sorted(f'{w.language}\t{w.word}\t{w.learning_stage}\t{w.date.isoformat()}' for w in words):
+        digest.update(line.encode())
+    plots_config = {k: v for k, v in config.model_dump().items() if k.startswith('PLOTS_')}
+    digest.update(repr(sorted(plots_config.items())).encode())
+    return digest.hexdigest()
+
+
+def serve_compressed(server: flask.Flask, fingerprint: Callable[[], str]) -> None:
+    """Compress GET responses once per URL and encoding and answer unchanged reloads with 304.
+
+    The fingerprint is asked on every request, it changes when the preview is replaced by the full plots.
+    It's read before the body is rendered and the figure is swapped before it changes, so an ETag never
+    names an older body than the one sent with it.
+    """
+    compressed_bodies: dict[str, bytes] = {}  # Hash of the body and encoding -> compressed body
+
+    def base_etag() -> str:
+        return hashlib.sha256(f'{fingerprint()}{flask.request.full_path}'.encode()).hexdigest()[:32]
+
+    def choose_encoding() -> str | None:
+        return next((e for e in COMPRESSORS if e in flask.request.accept_encodings), None)
+
+    def not_modified() -> flask.Response | None:
+        if flask.request.method != 'GET':
+            return None
+        etag = flask.g.base_etag = base_etag()
+        for candidate in (etag, *(f'{etag}-{encoding}' for encoding in COMPRESSORS)):
+            if candidate in flask.request.if_none_match:
+                response = flask.Response(status=304)
+                response.set_etag(candidate)
+                return response
+        return None
+
+    def compress(response: flask.Response) -> flask.Response:
+        if flask.request.method != 'GET' or response.status_code != 200 or response.direct_passthrough:
+            return response
+
+        etag = flask.g.get('base_etag') or base_etag()
+        response.vary.add('Accept-Encoding')
+        if 'Cache-Control' not in response.headers:
+            response.cache_control.no_cache = True  # Revalidate with the ETag on every reload
+
+        encoding = choose_encoding()
+        if (
+            encoding is None
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or (response.content_length or 0) < MIN_COMPRESSED_SIZE
+        ):
+            response.set_etag(etag)
+            return response
+
+        etag = f'{etag}-{encoding}'
+        body = response.get_data()
+        key = f'{hashlib.sha256(body).hexdigest()}-{encoding}'
+        if key not in compressed_bodies:
+            compressed_bodies[key] = COMPRESSORS[encoding](body)
+        response.set_data(compressed_bodies[key])
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        return response
+
+    def precompress() -> None:
+        with server.test_client() as client:
+            index_html = client.get('/', headers={'Accept-Encoding': 'identity'}).get_data(as_text=True)
+            urls = ('/', '/_dash-layout', '/_dash-dependencies', *SCRIPT_SRC_PATTERN.findall(index_html))
+            for encoding in COMPRESSORS:
+                for url in urls:
+                    client.get(url, headers={'Accept-Encoding': encoding})
+
+    server.before_request(not_modified)
+    server.after_request(compress)
+    threading.Thread(target=precompress, daemon=True).start()
@@ -0,0 +1,118 @@
+"""A resident process that keeps the words and kanji in memory and answers the CLI over a Unix socket."""
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any
+
+import fire  # type: ignore
+from path import Path
+
+from polyglotka.client import SERVED_COMMANDS, app_env
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint, redirected
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer import freshness, words_cache
+from polyglotka.importer.words import forget_shared_words, import_words, share_words
+from polyglotka.simple_commands.kanji import load_sorted_desc_kanji
+
+
+class _WordsState:
+    """Shared words are dropped when another process updates the cache or new files wait for import."""
+
+    def __init__(self) -> None:
+        self.cache_mtime: float | None = None
+
+    def refresh(self) -> None:
+        # The same rule as `import_words`, which imports them even while the cache is fresh
+        if freshness.new_files_waiting() or self._current_mtime() != self.cache_mtime:
+            forget_shared_words()
+
+    def remember(self) -> None:
+        self.cache_mtime = self._current_mtime()
+
+    @staticmethod
+    def _current_mtime() -> float | None:
+        return words_cache.mtime()
+
+
+def answer(request: dict[str, Any], words_state: _WordsState) -> dict[str, Any]:
+    from polyglotka.main import entrypoint
+
+    if request['env'] != app_env():
+        return dict(status='fallback')  # The client's variables would change the answer
+    if not request['argv'] or request['argv'][0] not in SERVED_COMMANDS:
+        return dict(status='fallback')  # Others would block, stop or change the server for every client
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    cwd = os.getcwd()
+    words_state.refresh()
+    try:
+        os.chdir(request['cwd'])  # For relative paths like --output
+        # The console keeps the stderr it was created with, so it's redirected on its own
+        with redirect_stdout(stdout), redirect_stderr(stderr), redirected(stderr), config.restored_after():
+            fire.Fire(entrypoint, command=request['argv'], name=config.APP_NAME)
+    except UserError as exc:
+        print(exc, file=stderr)
+        exit_code = 1
+    except SystemExit as exc:  # Fire exits on bad flags and --help
+        exit_code = exc.code if isinstance(exc.code, int) else 1
+    except Exception:
+        stderr.write(traceback.format_exc())
+        exit_code = 1
+    finally:
+        os.chdir(cwd)
+        words_state.remember()
+
+    return dict(status='ok', stdout=stdout.getvalue(), stderr=stderr.getvalue(), exit_code=exit_code)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    words_state = _WordsState()
+
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        pprint(f'Answering: {" ".join(request["argv"])}')
+        self.wfile.write(json.dumps(answer(request, self.words_state)).encode() + b'\n')
+
+
+def _check_not_running(socket_file: Path) -> None:
+    if not socket_file.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_file)
+        except OSError:
+            socket_file.remove()  # Left by a server that died
+            return
+    raise UserError(f'Server is already running: "{socket_file}"')
+
+
+def main() -> None:
+    if not hasattr(socket, 'AF_UNIX'):
+        raise UserError('The server needs Unix sockets, which this platform lacks')
+
+    socket_file = Path(config.SERVER_SOCKET)
+    _check_not_running(socket_file)
+
+    with share_words():
+        load_sorted_desc_kanji(import_words())  # Warm up before the first request
+        _Handler.words_state.remember()
+
+        # Requests are answered one at a time: commands override the global config
+        with socketserver.UnixStreamServer(socket_file, _Handler) as server:
+            pprint(f'Serving on "{socket_file}", press Ctrl+C to stop.')
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit())  # Remove the socket when killed too
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                socket_file.remove_p()
@@ -0,0 +1,205 @@
+"""Tag and unsuspend kanji notes right in a local Anki collection, no search query to paste."""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from typing import Iterable
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+
+FIELD_SEPARATOR = '\x1f'
+SUSPENDED_QUEUE = -1
+LEARN_TYPES = (1, 3)  # Learning, relearning
+LEARN_QUEUE = 1
+DAY_LEARN_QUEUE = 3
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+DECK_FILTER_PATTERN = re.compile(r'(?:^|\s)"?deck:([^"\s]+)"?')
+
+# Anki's rule for the queue a card goes back to when unsuspended
+RESTORED_QUEUE_SQL = f'''
+    CASE WHEN type IN {LEARN_TYPES}
+        THEN (CASE WHEN due > 1000000000 THEN {LEARN_QUEUE} ELSE {DAY_LEARN_QUEUE} END)
+        ELSE type
+    END
+'''
+
+
+def strip_html(text: str) -> str:
+    return HTML_TAG_PATTERN.sub('', text).strip()
+
+
+def field_checksum(text: str) -> int:
+    """Same as notes.csum: first 8 hex digits of sha1 of the stripped first field."""
+    return int(hashlib.sha1(strip_html(text).encode()).hexdigest()[:8], 16)
+
+
+def unicase(a: str, b: str) -> int:
+    return (a.lower() > b.lower()) - (a.lower() < b.lower())
+
+
+def connect(collection_file: Path) -> sqlite3.Connection:
+    if not collection_file.is_file():
+        raise UserError(f'Anki collection not found: "{collection_file}"')
+
+    conn = sqlite3.connect(collection_file, timeout=1, isolation_level=None)
+    conn.create_collation('unicase', unicase)  # Anki's columns are declared with it
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+    except sqlite3.OperationalError:
+        conn.close()
+        raise UserError('Anki collection is locked. Close Anki and try again.')
+    return conn
+
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+        is not None
+    )
+
+
+def find_field_ords(conn: sqlite3.Connection, field_name: str) -> dict[int, int]:
+    """Note type id -> position of the kanji field in its notes."""
+    if has_table(conn, 'fields'):  # Schema 15+
+        rows = conn.execute('SELECT ntid, ord, name FROM fields').fetchall()
+    else:
+        models = json.loads(conn.execute('SELECT models FROM col').fetchone()[0])
+        rows = [(int(mid), fld['ord'], fld['name']) for mid, model in models.items() for fld in model['flds']]
+    return {ntid: ord_ for ntid, ord_, name in rows if name.lower() == field_name.lower()}
+
+
+def find_deck_ids(conn: sqlite3.Connection, deck_name: str) -> list[int]:
+    """The deck and its subdecks, like Anki's `deck:` search."""
+    if has_table(conn, 'decks'):
+        decks = [
+            (did, name.replace(FIELD_SEPARATOR, '::'))
+            for did, name in conn.execute('SELECT id, name FROM decks')
+        ]
+    else:
+        decks = [
+            (int(did), deck['name'])
+            for did, deck in json.loads(conn.execute('SELECT decks FROM col').fetchone()[0]).items()
+        ]
+
+    deck_name = deck_name.lower()
+    return [
+        did for did, name in decks if name.lower() == deck_name or name.lower().startswith(f'{deck_name}::')
+    ]
+
+
+def add_to_tag_list(conn: sqlite3.Connection, tag: str) -> None:
+    """Schema 15+ lists tags in a table of their own, the browser sidebar shows only those."""
+    if not has_table(conn, 'tags'):
+        return
+    columns = {name for _, name, *_ in conn.execute('PRAGMA table_info(tags)')}
+    if 'collapsed' in columns:
+        conn.execute('INSERT OR IGNORE INTO tags (tag, usn, collapsed) VALUES (?, -1, 0)', (tag,))
+    else:
+        conn.execute('INSERT OR IGNORE INTO tags (tag, usn) VALUES (?, -1)', (tag,))
+
+
+def deck_from_filters(filters: str) -> str | None:
+    return match.group(1) if (match := DECK_FILTER_PATTERN.search(filters)) else None
+
+
+@span('Finding kanji notes')
+def find_notes(
+    conn: sqlite3.Connection, field_ords: dict[int, int], chars: list[str]
+) -> list[tuple[int, str]]:
+    """(note id, tags) of notes whose kanji field is one of the chars."""
+    wanted = set(chars)
+    notetype_ids = ','.join(map(str, field_ords))
+
+    if all(ord_ == 0 for ord_ in field_ords.values()):
+        # The kanji is the first field, which csum is of: one lookup on its index, checked against collisions
+        conn.execute('CREATE TEMP TABLE polyglotka_csums (csum INTEGER PRIMARY KEY)')
+        conn.executemany(
+            'INSERT OR IGNORE INTO polyglotka_csums VALUES (?)', ((field_checksum(c),) for c in wanted)
+        )
+        rows = conn.execute(
+            f'SELECT n.id, n.mid, n.flds, n.tags FROM notes n JOIN polyglotka_csums c ON n.csum = c.csum '
+            f'WHERE n.mid IN ({notetype_ids})'
+        )
+    else:
+        rows = conn.execute(f'SELECT id, mid, flds, tags FROM notes WHERE mid IN ({notetype_ids})')
+
+    return [
+        (nid, tags)
+        for nid, mid, flds, tags in rows
+        if strip_html(flds.split(FIELD_SEPARATOR)[field_ords[mid]]) in wanted
+    ]
+
+
+def add_tag(tags: str, tag: str) -> str | None:
+    """New tags string, None if the tag is there already."""
+    tag_list = tags.split()
+    if tag.lower() in (t.lower() for t in tag_list):
+        return None
+    return f' {" ".join(sorted([*tag_list, tag], key=str.lower))} '
+
+
+@span('Updating Anki collection')
+def update_collection(chars: Iterable[str]) -> None:
+    collection_file = Path(config.ANKI_COLLECTION).expand()
+    chars = list(chars)
+    conn = connect(collection_file)
+    try:
+        field_ords = find_field_ords(conn, config.ANKI_KANJI_FIELD)
+        if not field_ords:
+            raise UserError(f'No note type has a field named "{config.ANKI_KANJI_FIELD}" (ANKI_KANJI_FIELD)')
+
+        # Both tagging and unsuspending keep to the deck of ANKI_FILTERS, like the pasted search query
+        deck_filter = ''
+        if deck := deck_from_filters(config.ANKI_FILTERS):
+            if not (deck_ids := find_deck_ids(conn, deck)):
+                raise UserError(f'Deck "{deck}" from ANKI_FILTERS is not found in "{collection_file}"')
+            deck_filter = f'AND did IN ({",".join(map(str, deck_ids))})'
+
+        notes = find_notes(conn, field_ords, chars) if chars else []
+        if notes and deck_filter:
+            rows = conn.execute(f'SELECT DISTINCT nid FROM cards WHERE true {deck_filter}')
+            in_deck = {nid for (nid,) in rows}
+            notes = [(nid, tags) for nid, tags in notes if nid in in_deck]
+        now = int(time.time())
+        tag = config.ANKI_TAG.strip()
+
+        tagged = [
+            (new_tags, now, nid)
+            for nid, tags in notes
+            if tag and (new_tags := add_tag(tags, tag)) is not None
+        ]
+        conn.executemany('UPDATE notes SET tags = ?, mod = ?, usn = -1 WHERE id = ?', tagged)
+        if tagged:
+            add_to_tag_list(conn, tag)
+
+        unsuspended = 0
+        if config.ANKI_UNSUSPEND and notes:
+            conn.execute('CREATE TEMP TABLE polyglotka_notes (id INTEGER PRIMARY KEY)')
+            conn.executemany('INSERT INTO polyglotka_notes VALUES (?)', ((nid,) for nid, _ in notes))
+
+            unsuspended = conn.execute(
+                f'UPDATE cards SET queue = {RESTORED_QUEUE_SQL}, mod = ?, usn = -1 '
+                f'WHERE queue = {SUSPENDED_QUEUE} AND nid IN (SELECT id FROM polyglotka_notes) {deck_filter}',
+                (now,),
+            ).rowcount
+
+        if tagged or unsuspended:
+            conn.execute('UPDATE col SET mod = ?', (now * 1000,))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+    pprint(
+        f'Found {len(notes)} notes for {len(chars)} kanji in "{collection_file}".\n'
+        f'Tagged {len(tagged)} notes, unsuspended {unsuspended} cards.'
+    )
@@ -0,0 +1,259 @@
+"""Anki package of the LEARNING words with the line they were saved in, its translation, audio and thumbnail.
+
+The collection is filled in batches in a temporary SQLite file, then the package is written as a stream:
+the collection and every media file are copied into the zip one at a time, straight from disk.
+"""
+
+import hashlib
+import html
+import json
+import sqlite3
+import tempfile
+import time
+import zipfile
+from typing import Any, Iterable, Iterator
+
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.language_reactor.media import media_path
+from polyglotka.importer.sources import batched
+from polyglotka.importer.words import LearningStage, Word, import_words
+from polyglotka.simple_commands.anki_collection import FIELD_SEPARATOR, field_checksum
+
+INSERT_BATCH = 1000
+SCHEMA_VERSION = 11  # The legacy schema, every Anki version imports it
+DEFAULT_DECK_ID = 1
+FIELDS = ('Word', 'Context', 'Translation', 'Audio', 'Image')
+
+SCHEMA = '''
+    CREATE TABLE col (
+        id integer PRIMARY KEY, crt integer NOT NULL, mod integer NOT NULL, scm integer NOT NULL,
+        ver integer NOT NULL, dty integer NOT NULL, usn integer NOT NULL, ls integer NOT NULL,
+        conf text NOT NULL, models text NOT NULL, decks text NOT NULL, dconf text NOT NULL, tags text NOT NULL
+    );
+    CREATE TABLE notes (
+        id integer PRIMARY KEY, guid text NOT NULL, mid integer NOT NULL, mod integer NOT NULL,
+        usn integer NOT NULL, tags text NOT NULL, flds text NOT NULL, sfld integer NOT NULL,
+        csum integer NOT NULL, flags integer NOT NULL, data text NOT NULL
+    );
+    CREATE TABLE cards (
+        id integer PRIMARY KEY, nid integer NOT NULL, did integer NOT NULL, ord integer NOT NULL,
+        mod integer NOT NULL, usn integer NOT NULL, type integer NOT NULL, queue integer NOT NULL,
+        due integer NOT NULL, ivl integer NOT NULL, factor integer NOT NULL, reps integer NOT NULL,
+        lapses integer NOT NULL, left integer NOT NULL, odue integer NOT NULL, odid integer NOT NULL,
+        flags integer NOT NULL, data text NOT NULL
+    );
+    CREATE TABLE revlog (
+        id integer PRIMARY KEY, cid integer NOT NULL, usn integer NOT NULL, ivl integer NOT NULL,
+        lastIvl integer NOT NULL, factor integer NOT NULL, time integer NOT NULL, type integer NOT NULL
+    );
+    CREATE TABLE graves (usn integer NOT NULL, oid integer NOT NULL, type integer NOT NULL);
+    CREATE INDEX ix_notes_usn ON notes (usn);
+    CREATE INDEX ix_cards_usn ON cards (usn);
+    CREATE INDEX ix_revlog_usn ON revlog (usn);
+    CREATE INDEX ix_cards_nid ON cards (nid);
+    CREATE INDEX ix_cards_sched ON cards (did, queue, due);
+    CREATE INDEX ix_revlog_cid ON revlog (cid);
+    CREATE INDEX ix_notes_csum ON notes (csum);
+'''
+
+FRONT = '{{Word}}<br><br><div class="context">{{Context}}</div>'
+BACK = '{{FrontSide}}<hr id="answer"><div class="translation">{{Translation}}</div>{{Audio}}<br>{{Image}}'
+CSS = '''.card { font-family: sans-serif; font-size: 28px; text-align: center; }
+.context { font-size: 20px; }
+.translation { font-size: 18px; color: gray; }
+img { max-width: 100%; }'''
+
+DECK_OPTIONS = {
+    'id': DEFAULT_DECK_ID,
+    'name': 'Default',
+    'mod': 0,
+    'usn': 0,
+    'maxTaken': 60,
+    'autoplay': True,
+    'timer': 0,
+    'replayq': True,
+    'dyn': False,
+    'new': dict(
+        bury=True, delays=[1, 10], initialFactor=2500, ints=[1, 4, 7], order=1, perDay=20, separate=True
+    ),
+    'rev': dict(bury=True, ease4=1.3, fuzz=0.05, ivlFct=1, maxIvl=36500, minSpace=1, perDay=200),
+    'lapse': dict(delays=[10], leechAction=0, leechFails=8, minInt=1, mult=0),
+}
+
+
+def _id_from(text: str) -> int:
+    """Stable ids, so importing a newer package updates the deck instead of adding another one."""
+    return int(hashlib.sha1(text.encode()).hexdigest()[:12], 16)
+
+
+def create_deck(deck_id: int, name: str, now: int) -> dict[str, Any]:
+    return {
+        'id': deck_id,
+        'name': name,
+        'desc': '',
+        'mod': now,
+        'usn': -1,
+        'conf': DEFAULT_DECK_ID,
+        'dyn': 0,
+        'collapsed': False,
+        'browserCollapsed': False,
+        'extendNew': 0,
+        'extendRev': 0,
+        **{f'{kind}Today': [0, 0] for kind in ('new', 'rev', 'lrn', 'time')},
+    }
+
+
+def create_note_type(note_type_id: int, deck_id: int, now: int) -> dict[str, Any]:
+    return {
+        'id': note_type_id,
+        'name': f'{config.APP_NAME.capitalize()} Word',
+        'type': 0,
+        'mod': now,
+        'usn': -1,
+        'sortf': 0,
+        'did': deck_id,
+        'tmpls': [dict(name='Recognition', ord=0, qfmt=FRONT, afmt=BACK, did=None, bqfmt='', bafmt='')],
+        'flds': [
+            dict(name=name, ord=ord_, sticky=False, rtl=False, font='Arial', size=20, media=[])
+            for ord_, name in enumerate(FIELDS)
+        ],
+        'css': CSS,
+        'latexPre': '',
+        'latexPost': '',
+        'tags': [],
+        'vers': [],
+        'req': [[0, 'any', [0]]],
+    }
+
+
+def highlight(context: str, word: str) -> str:
+    return html.escape(context).replace(html.escape(word), f'<b>{html.escape(word)}</b>')
+
+
+class Media:
+    """Media files of the package in the order they're added to the zip, named by number as Anki wants."""
+
+    def __init__(self) -> None:
+        self.refs: list[str] = []
+
+    def field(self, word: Word, kind: str, template: str) -> str:
+        if not (ref := word.media.get(kind)) or not media_path(ref).exists():
+            return ''
+        self.refs.append(ref)
+        return template.format(ref=ref)
+
+
+def create_note_rows(
+    words: Iterable[Word], media: Media, note_type_id: int, deck_ids: dict[str, int], now: int
+) -> Iterator[tuple[tuple[Any, ...], tuple[Any, ...]]]:
+    """A notes row and a cards row per word, in the order of the new cards queue."""
+    first_id = now * 1000
+    for position, word in enumerate(words):
+        fields = (
+            html.escape(word.word),
+            highlight(word.context, word.word),
+            html.escape(word.translation),
+            media.field(word, 'audio', '[sound:{ref}]'),
+            media.field(word, 'thumb_prev', '<img src="{ref}">'),
+        )
+        guid = f'{config.APP_NAME}:{word.language}:{word.word}'
+        note = (
+            first_id + position,
+            hashlib.sha1(guid.encode()).hexdigest()[:16],
+            note_type_id,
+            now,
+            -1,
+            f' {config.APP_NAME} {word.language} ',
+            FIELD_SEPARATOR.join(fields),
+            fields[0],
+            field_checksum(fields[0]),
+            0,
+            '',
+        )
+        card = (first_id + position, first_id + position, deck_ids[word.language], 0, now, -1)
+        yield note, card + (0, 0, position + 1, 0, 0, 0, 0, 0, 0, 0, 0, '')
+
+
+@span('Filling collection')
+def fill_collection(collection_file: str, words: list[Word], media: Media) -> None:
+    now = int(time.time())
+    deck_ids = {lang: _id_from(f'{config.APKG_DECK}::{lang}') for lang in sorted({w.language for w in words})}
+    note_type_id = _id_from(f'{config.APP_NAME} word note type')
+    parent_deck_id = _id_from(config.APKG_DECK)
+    decks = {
+        DEFAULT_DECK_ID: create_deck(DEFAULT_DECK_ID, 'Default', now),
+        parent_deck_id: create_deck(parent_deck_id, config.APKG_DECK, now),
+    }
+    for lang, deck_id in deck_ids.items():
+        decks[deck_id] = create_deck(deck_id, f'{config.APKG_DECK}::{lang}', now)
+    conf = dict(
+        activeDecks=[DEFAULT_DECK_ID], curDeck=DEFAULT_DECK_ID, curModel=note_type_id, nextPos=len(words) + 1
+    )
+
+    conn = sqlite3.connect(collection_file, isolation_level=None)
+    try:
+        conn.executescript(SCHEMA)
+        conn.execute('BEGIN')
+        conn.execute(
+            'INSERT INTO col VALUES (1, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?, ?, ?)',
+            (
+                now,
+                now * 1000,
+                now * 1000,
+                SCHEMA_VERSION,
+                json.dumps(conf),
+                json.dumps(
+                    {note_type_id: create_note_type(note_type_id, next(iter(deck_ids.values())), now)}
+                ),
+                json.dumps(decks),
+                json.dumps({DEFAULT_DECK_ID: DECK_OPTIONS}),
+                '{}',
+            ),
+        )
+        for batch in batched(create_note_rows(words, media, note_type_id, deck_ids, now), INSERT_BATCH):
+            conn.executemany(f'INSERT INTO notes VALUES ({", ".join("?" * 11)})', [note for note, _ in batch])
+            conn.executemany(f'INSERT INTO cards VALUES ({", ".join("?" * 18)})', [card for _, card in batch])
+        conn.execute('COMMIT')
+    finally:
+        conn.close()
+
+
+@span('Writing package')
+def write_package(file: Path, collection_file: str, media: Media) -> None:
+    with replace_atomic(file) as tmp, zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.write(collection_file, 'collection.anki2')
+        names: dict[str, str] = {}
+        for ref in dict.fromkeys(media.refs):  # MP3s and JPEGs are compressed already
+            package.write(media_path(ref), str(len(names)), compress_type=zipfile.ZIP_STORED)
+            names[str(len(names))] = ref
+        package.writestr('media', json.dumps(names))
+
+
+def main() -> None:
+    imported_words = import_words(langs=[config.LANG] if config.LANG else None)
+    words = sorted(
+        (
+            w
+            for w in imported_words
+            if w.learning_stage == LearningStage.LEARNING and config.LANG in (w.language, '')
+        ),
+        key=lambda w: (w.language, w.date, w.word),  # The order they were saved in
+    )
+    if not words:
+        raise UserError(f'No LEARNING words found{f" in LANG: {repr(config.LANG)}" if config.LANG else "."}')
+
+    file = (
+        Path(config.EXPORT_DIR) / f'{config.APP_NAME}_learning{f"_{config.LANG}" if config.LANG else ""}.apkg'
+    )
+    media = Media()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        collection_file = Path(tmp_dir) / 'collection.anki2'
+        fill_collection(collection_file, words, media)
+        write_package(file, collection_file, media)
+    pprint(f'Saved {len(words)} LEARNING words with {len(set(media.refs))} media files: "{file}".')
@@ -0,0 +1,121 @@
+"""Import words for many learners at once, one worker process per learner."""
+
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any
+
+from path import Path
+from pydantic import BaseModel
+
+from polyglotka.common.config import config
+from polyglotka.common.console import Progress, ProgressType, mute, pprint
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.utils import write_text_atomic
+from polyglotka.importer import rollups
+from polyglotka.importer.words import import_words
+from polyglotka.simple_commands.kanji import create_tsv_row
+from polyglotka.simple_commands.stats import create_tsv_stats
+
+ALL = 'ALL'  # all learners
+STATS_FILE_NAME = f'{config.APP_NAME}_stats.tsv'
+COHORT_FILE_NAME = f'{config.APP_NAME}_cohort.tsv'
+
+
+class LearnerSummary(BaseModel):
+    learner: str
+    totals: dict[tuple[str, str], int] = {}  # (language, stage) -> words
+    recent: dict[tuple[str, str], int] = {}  # (language, stage) -> words in the last STATS_DAYS days
+    error: str = ''
+
+
+def find_learner_dirs() -> list[Path]:
+    if not config.BATCH_DIR:
+        raise UserError.from_unset_env_var('batch_dir')
+    if not Path(config.BATCH_DIR).is_dir():
+        raise UserError(f'Directory not found: {config.BATCH_DIR}')
+
+    learner_dirs = sorted(d for d in Path(config.BATCH_DIR).dirs() if not d.name.startswith('.'))
+    if not learner_dirs:
+        raise UserError(f'No learner directories found in: {config.BATCH_DIR}')
+    return learner_dirs
+
+
+def ingest_learner(learner_dir: str, parent_config: dict[str, Any]) -> LearnerSummary:
+    """Runs in a worker process with its own copy of the config singleton."""
+    mute()
+    learner_dir = Path(learner_dir)
+    vars(config).update(parent_config)
+    config.use_cache_dir(Path(parent_config['CACHE_DIR']) / 'learners' / learner_dir.name)
+    vars(config).update(
+        EXPORTED_FILES_DIR=learner_dir,
+        KNOWN_MORPHS_DIR=learner_dir,
+        CHROME=False,  # There's only one Chrome profile per machine
+        CACHE_TTL=0,  # Every run imports the files of every learner
+    )
+
+    try:
+        import_words()
+    except UserError as exc:
+        return LearnerSummary(learner=learner_dir.name, error=str(exc))
+
+    learner_rollups = rollups.read()
+    write_text_atomic(learner_dir / STATS_FILE_NAME, create_tsv_stats(learner_rollups))
+
+    since = (date.today() - timedelta(days=config.STATS_DAYS - 1)).isoformat()
+    totals: Counter[tuple[str, str]] = Counter()
+    recent: Counter[tuple[str, str]] = Counter()
+    for (lang, stage, day), count in learner_rollups.items():
+        totals[(lang, stage)] += count
+        if day >= since:
+            recent[(lang, stage)] += count
+    return LearnerSummary(learner=learner_dir.name, totals=totals, recent=recent)
+
+
+def create_tsv_cohort(summaries: list[LearnerSummary]) -> str:
+    tsv_cohort: list[str] = [
+        create_tsv_row('Learner', 'Language', 'Stage', 'Total', f'Last {config.STATS_DAYS} Days')
+    ]
+    cohort_totals: Counter[tuple[str, str]] = Counter()
+    cohort_recent: Counter[tuple[str, str]] = Counter()
+
+    for summary in sorted(summaries, key=lambda s: s.learner):
+        for key, total in sorted(summary.totals.items()):
+            tsv_cohort.append(create_tsv_row(summary.learner, *key, total, summary.recent.get(key, 0)))
+        cohort_totals.update(summary.totals)
+        cohort_recent.update(summary.recent)
+
+    for key, total in sorted(cohort_totals.items()):
+        tsv_cohort.append(create_tsv_row(ALL, *key, total, cohort_recent[key]))
+    return '\n'.join(tsv_cohort)
+
+
+def main() -> None:
+    config.check_cache_paths_movable()  # Before any worker starts
+    learner_dirs = find_learner_dirs()
+    summaries: list[LearnerSummary] = []
+
+    with Progress(
+        progress_type=ProgressType.BAR,
+        text='Importing learners',
+        postfix='learners',
+        total_tasks=len(learner_dirs),
+    ) as progress:
+        with ProcessPoolExecutor(max_workers=config.BATCH_WORKERS or os.cpu_count()) as executor:
+            futures = [executor.submit(ingest_learner, d, config.model_dump()) for d in learner_dirs]
+            for future in as_completed(futures):
+                summaries.append(future.result())
+                progress.update(advance=1)
+
+    for summary in summaries:
+        if summary.error:
+            pprint(f'Skipped "{summary.learner}":')
+            print(summary.error, file=sys.stderr)
+
+    tsv_cohort = create_tsv_cohort(summaries)
+    cohort_file = Path(config.BATCH_DIR) / COHORT_FILE_NAME
+    write_text_atomic(cohort_file, tsv_cohort)
+    pprint(f'Saved cohort summary: "{cohort_file}".')
+    print(tsv_cohort)
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+import plotly.graph_objects as go  # pyright: ignore
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer.words import LearningStage, Word, import_words
+from polyglotka.plots.appearance import get_color
+from polyglotka.simple_commands.kanji import create_tsv_row
+
+
+def collect_known_ranks(words: Iterable[Word]) -> dict[str, np.ndarray]:
+    ranks: defaultdict[str, list[int]] = defaultdict(list)
+    for word in words:
+        if (
+            word.learning_stage == LearningStage.KNOWN
+            and word.freq_rank
+            and config.LANG in (word.language, '')
+        ):
+            ranks[word.language].append(word.freq_rank)
+    if not ranks:
+        raise UserError('No known words with frequency ranks. Ranks come from LR exports only')
+    return {lang: np.unique(lang_ranks) for lang, lang_ranks in sorted(ranks.items())}
+
+
+def coverage_curve(known_ranks: np.ndarray, max_rank: int) -> np.ndarray:
+    """Share of known words among the top r words for every r in 1..max_rank."""
+    hits = np.bincount(known_ranks[known_ranks <= max_rank], minlength=max_rank + 1)[1:]
+    return np.cumsum(hits) / np.arange(1, max_rank + 1)
+
+
+def create_tsv_coverage(known_ranks: dict[str, np.ndarray]) -> str:
+    top_ranks = config.coverage_ranks
+    tsv_coverage: list[str] = [create_tsv_row('Language', 'Top Words', 'Known', 'Coverage')]
+
+    for lang, ranks in known_ranks.items():
+        curve = coverage_curve(ranks, top_ranks[-1])
+        for top in top_ranks:
+            tsv_coverage.append(
+                create_tsv_row(lang, top, round(curve[top - 1] * top), f'{curve[top - 1]:.1%}')
+            )
+    return '\n'.join(tsv_coverage)
+
+
+def create_coverage_figure(known_ranks: dict[str, np.ndarray]) -> go.Figure:
+    fig = go.Figure()
+    for lang, ranks in known_ranks.items():
+        curve = coverage_curve(ranks, int(ranks.max()))
+        fig.add_trace(  # pyright: ignore
+            go.Scatter(
+                x=np.arange(1, len(curve) + 1),
+                y=curve,
+                mode='lines',
+                name=lang.upper(),
+                line=dict(color=get_color(lang, LearningStage.KNOWN), width=3),
+            )
+        )
+    fig.update_layout(  # pyright: ignore
+        title=dict(text='Known Words Coverage', x=0.5),
+        xaxis=dict(title=dict(text='Frequency Rank'), type='log'),
+        yaxis=dict(title=dict(text='Known Share of Top Words'), tickformat='.0%', range=[0, 1]),
+        template='plotly_dark',
+        plot_bgcolor=config.PLOTS_BACKGROUND_COLOR,
+        paper_bgcolor=config.PLOTS_BACKGROUND_COLOR,
+        hovermode='x unified',
+    )
+    return fig
+
+
+def main() -> None:
+    known_ranks = collect_known_ranks(import_words(langs=[config.LANG] if config.LANG else None))
+    print(create_tsv_coverage(known_ranks))
+    if config.COVERAGE_PLOT:
+        create_coverage_figure(known_ranks).show()  # pyright: ignore
@@ -0,0 +1,34 @@
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.importer import snapshots
+from polyglotka.importer.snapshots import Row
+from polyglotka.simple_commands.kanji import create_tsv_row
+
+ADDED = 'ADDED'
+REMOVED = 'REMOVED'
+CHANGED = 'CHANGED'
+
+
+def create_tsv_diff(old_rows: list[Row], new_rows: list[Row]) -> tuple[str, dict[str, int]]:
+    tsv_diff: list[str] = [create_tsv_row('Change', 'Language', 'Word', 'Old Stage', 'New Stage')]
+    counts = {ADDED: 0, REMOVED: 0, CHANGED: 0}
+
+    for old, new in snapshots.merge_diff(old_rows, new_rows):
+        lang, word, _ = old or new  # type: ignore
+        if config.LANG not in (lang, ''):
+            continue
+        change = CHANGED if old and new else ADDED if new else REMOVED
+        counts[change] += 1
+        tsv_diff.append(create_tsv_row(change, lang, word, old[2] if old else '', new[2] if new else ''))
+
+    return '\n'.join(tsv_diff), counts
+
+
+def main() -> None:
+    old_id, new_id = snapshots.resolve(config.DIFF_FROM), snapshots.resolve(config.DIFF_TO)
+    tsv_diff, counts = create_tsv_diff(snapshots.load(old_id), snapshots.load(new_id))
+
+    pprint(
+        f'{old_id} -> {new_id}: ' + ', '.join(f'{count} {change.lower()}' for change, count in counts.items())
+    )
+    print(tsv_diff)
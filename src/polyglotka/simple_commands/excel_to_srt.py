@@ -9,6 +9,7 @@ from path import Path
 from polyglotka.common.config import config
 from polyglotka.common.console import pprint
 from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
 from polyglotka.common.utils import remove_files_maybe
 
 
@@ -152,13 +153,15 @@ def create_srt_name(episode: int, total: int) -> str:
     return f'{config.NAME}_{episode}'
 
 
+@span('Writing SRT files')
 def create_srt_file(srt_path: Path, srt_text: str) -> None:
     srt_path.write_text(srt_text, encoding='utf-8')
     pprint(f'Added "{srt_path}".')
 
 
 def convert_excel_to_srt(lr_subs_file: str, srt_name: str, target_dir: Path) -> None:
-    dataframe: pd.DataFrame = pd.read_excel(Path(lr_subs_file))  # type: ignore
+    with span('Reading Excel subs'):
+        dataframe: pd.DataFrame = pd.read_excel(Path(lr_subs_file))  # type: ignore
 
     times_ms: list[int | None] = [parse_time(value) for value in dataframe['Time']]
     primary_texts: list[str] = dataframe['Subtitle'].tolist()
@@ -166,7 +169,8 @@ def convert_excel_to_srt(lr_subs_file: str, srt_name: str, target_dir: Path) ->
         dataframe['Machine Translation'].tolist() if 'Machine Translation' in dataframe.columns else None
     )
 
-    segments: list[SubtitleSegment | None] = build_segments(times_ms, primary_texts, secondary_texts)
+    with span('Building segments'):
+        segments: list[SubtitleSegment | None] = build_segments(times_ms, primary_texts, secondary_texts)
 
     if secondary_texts is not None:
         create_srt_file(
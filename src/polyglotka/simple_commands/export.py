@@ -0,0 +1,105 @@
+"""Columnar export of the words, the plotted timelines and the kanji for DuckDB, pandas and friends."""
+
+from typing import Any
+
+import numpy as np
+from path import Path
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.common.exceptions import UserError
+from polyglotka.common.profiling import span
+from polyglotka.common.utils import replace_atomic
+from polyglotka.importer.words import Word, import_words
+from polyglotka.importer.words_index import WordIndex, import_pyarrow
+from polyglotka.plots.figure import create_figure
+from polyglotka.simple_commands.kanji import load_sorted_desc_kanji
+
+FORMATS = ('parquet', 'arrow')
+COMPRESSION = 'zstd'
+BATCH_ROWS = 64 * 1024
+
+
+def words_table(words: set[Word]) -> Any:
+    return WordIndex(words).to_arrow()
+
+
+def timelines_table(words: set[Word]) -> Any:
+    """The series behind every line of `polyglotka plots`, one row per point."""
+    pa = import_pyarrow()
+
+    columns: dict[str, list[Any]] = dict(trace=[], language=[], learning_stage=[], date=[], word_count=[])
+    for trace in create_figure(words).data:  # pyright: ignore
+        if not trace.meta:  # pyright: ignore
+            continue  # Empty traces
+        size = len(trace.x)  # pyright: ignore
+        for name, value in (
+            ('trace', trace.name),  # pyright: ignore
+            ('language', trace.meta['language']),  # pyright: ignore
+            ('learning_stage', trace.meta['stage']),  # pyright: ignore
+        ):
+            columns[name].append(pa.repeat(value, size).dictionary_encode())  # pyright: ignore
+        columns['date'].append(pa.array(np.asarray(trace.x, dtype='datetime64[us]')))  # pyright: ignore
+        columns['word_count'].append(pa.array(np.asarray(trace.y, dtype=np.int64)))  # pyright: ignore
+
+    schema = pa.schema(
+        [
+            ('trace', pa.dictionary(pa.int32(), pa.string())),
+            ('language', pa.dictionary(pa.int32(), pa.string())),
+            ('learning_stage', pa.dictionary(pa.int32(), pa.string())),
+            ('date', pa.timestamp('us')),
+            ('word_count', pa.int64()),
+        ]
+    )
+    return pa.Table.from_arrays(
+        [pa.chunked_array(chunks, type=field.type) for chunks, field in zip(columns.values(), schema)],
+        schema=schema,
+    ).unify_dictionaries()
+
+
+def kanji_table(words: set[Word]) -> Any:
+    pa = import_pyarrow()
+
+    kanji = load_sorted_desc_kanji(words)
+    return pa.table(
+        {
+            'kanji': pa.array([k.char for k in kanji], type=pa.string()),
+            'known_words_count': pa.array([len(k.known_words) for k in kanji], type=pa.int32()),
+            'learning_words_count': pa.array([len(k.learning_words) for k in kanji], type=pa.int32()),
+            'known_words': pa.array([sorted(k.known_words) for k in kanji], type=pa.list_(pa.string())),
+            'learning_words': pa.array([sorted(k.learning_words) for k in kanji], type=pa.list_(pa.string())),
+        }
+    )
+
+
+def write_table(table: Any, file: Path) -> None:
+    """Write in record batches with compression, through a temp file and a rename."""
+    pa = import_pyarrow()
+
+    with replace_atomic(file) as tmp:
+        if config.EXPORT_FORMAT == 'parquet':
+            import pyarrow.parquet as pq  # pyright: ignore
+
+            with pq.ParquetWriter(tmp, table.schema, compression=COMPRESSION) as writer:
+                for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+                    writer.write_batch(batch)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+            with pa.ipc.new_file(tmp, table.schema, options=options) as writer:
+                for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+                    writer.write_batch(batch)
+
+
+def main() -> None:
+    if config.EXPORT_FORMAT not in FORMATS:
+        raise UserError(f'EXPORT_FORMAT must be one of {FORMATS}, not this: {repr(config.EXPORT_FORMAT)}')
+    import_pyarrow()  # Fail before importing words
+
+    words = import_words()
+    tables = dict(words=words_table, timelines=timelines_table, kanji=kanji_table)
+    for name, create_table in tables.items():
+        with span(f'Exporting {name}'):
+            table = create_table(words)
+            file = Path(config.EXPORT_DIR) / f'{config.APP_NAME}_{name}.{config.EXPORT_FORMAT}'
+            write_table(table, file)
+        pprint(f'Exported {table.num_rows} rows ({name}): "{file}".')
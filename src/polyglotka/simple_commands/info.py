@@ -0,0 +1,37 @@
+import icecream
+
+from polyglotka.common.config import config
+from polyglotka.common.console import pprint
+from polyglotka.importer import words_cache
+from polyglotka.importer.words import LearningStage
+from polyglotka.simple_commands.kanji import create_tsv_row
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def create_tsv_cache_info(manifest: words_cache.Manifest) -> str:
+    tsv_info: list[str] = [
+        create_tsv_row('Language', 'Known', 'Learning', 'Total', 'First Date', 'Last Date')
+    ]
+    for lang, partition in sorted(manifest.partitions.items()):
+        tsv_info.append(
+            create_tsv_row(
+                lang,
+                partition.stages.get(LearningStage.KNOWN, 0),
+                partition.stages.get(LearningStage.LEARNING, 0),
+                partition.count,
+                partition.first_date.strftime(DATE_FORMAT),
+                partition.last_date.strftime(DATE_FORMAT),
+            )
+        )
+    return '\n'.join(tsv_info)
+
+
+def main() -> None:
+    icecream.ic(config.model_dump())
+
+    # The manifest alone, the cached words stay unread
+    if (manifest := words_cache.read_manifest()) is None:
+        pprint('Cached words are not found. Run "polyglotka import" first.')
+    else:
+        print(create_tsv_cache_info(manifest))
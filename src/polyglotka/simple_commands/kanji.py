@@ -6,6 +6,7 @@ import regex as re
 from pydantic import BaseModel
 
 from polyglotka.common.config import config
+from polyglotka.common.profiling import span
 from polyglotka.importer.words import LearningStage, Word, import_words
 
 
@@ -19,6 +20,7 @@ def find_kanji_chars(text: str) -> set[str]:
     return set(re.findall(r'\p{Han}', text, flags=re.VERSION1))
 
 
+@span('Collecting kanji')
 def collect_kanji_with_words(words: Iterable[Word]) -> list[Kanji]:
     kanji_dict: defaultdict[str, Kanji] = defaultdict(Kanji)
 
@@ -37,10 +39,22 @@ def collect_kanji_with_words(words: Iterable[Word]) -> list[Kanji]:
     return list(kanji_dict.values())
 
 
+@span('Sorting kanji')
 def sorted_desc_kanji(kanji_iterable: Iterable[Kanji]) -> list[Kanji]:
     return sorted(kanji_iterable, key=lambda k: (-len(k.known_words), -len(k.learning_words), k.char))
 
 
+_kanji_memo: tuple[set[Word], list[Kanji]] | None = None
+
+
+def load_sorted_desc_kanji(words: set[Word]) -> list[Kanji]:
+    """Collected once per word set, so `kanji` and `anki` share it within `run`."""
+    global _kanji_memo
+    if _kanji_memo is None or _kanji_memo[0] is not words:
+        _kanji_memo = (words, sorted_desc_kanji(collect_kanji_with_words(words)))
+    return _kanji_memo[1]
+
+
 def create_tsv_row(*data: Any) -> str:
     return '\t'.join(map(str, data))
 
@@ -64,12 +78,17 @@ def create_tsv_kanji(kanji_sorted_desc: Iterable[Kanji]) -> str:
     return '\n'.join(tsv_kanji)
 
 
-def create_anki_search_query(kanji_sorted_desc: Iterable[Kanji]) -> str:
-    top_kanji = takewhile(
-        lambda k: (len(k.known_words), len(k.learning_words)) >= config.anki_min_counts,
-        kanji_sorted_desc,
+def top_kanji(kanji_sorted_desc: Iterable[Kanji]) -> list[Kanji]:
+    return list(
+        takewhile(
+            lambda k: (len(k.known_words), len(k.learning_words)) >= config.anki_min_counts,
+            kanji_sorted_desc,
+        )
     )
-    kanji_or_kanji = ' OR '.join(f'{config.ANKI_KANJI_FIELD}:{k.char}' for k in top_kanji)
+
+
+def create_anki_search_query(kanji_sorted_desc: Iterable[Kanji]) -> str:
+    kanji_or_kanji = ' OR '.join(f'{config.ANKI_KANJI_FIELD}:{k.char}' for k in top_kanji(kanji_sorted_desc))
 
     return (
         f'{config.ANKI_FILTERS} ({kanji_or_kanji})'
@@ -80,4 +99,11 @@ def create_anki_search_query(kanji_sorted_desc: Iterable[Kanji]) -> str:
 
 def main(anki: bool = False) -> None:
     func: Callable[..., str] = create_anki_search_query if anki else create_tsv_kanji
-    print(func(sorted_desc_kanji(collect_kanji_with_words(import_words()))))
+    kanji_sorted_desc = load_sorted_desc_kanji(import_words(langs=['ja']))
+    if anki and config.ANKI_COLLECTION:
+        from polyglotka.simple_commands.anki_collection import update_collection
+
+        update_collection([k.char for k in top_kanji(kanji_sorted_desc)])
+        return
+    with span('Rendering kanji'):
+        print(func(kanji_sorted_desc))
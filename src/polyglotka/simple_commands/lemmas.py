@@ -0,0 +1,38 @@
+from typing import Iterable
+
+import numpy as np
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer import words_cache
+from polyglotka.importer.lemmas import LemmaIndex
+from polyglotka.importer.words import LearningStage, Word
+from polyglotka.simple_commands.kanji import create_tsv_row
+
+
+def create_tsv_lemmas(index: LemmaIndex, words: Iterable[Word]) -> str:
+    """The most frequent lemmas of LANG that aren't known yet, by the number of tokens seen."""
+    lang = config.LANG
+    if lang not in (langs := set(index.languages)):
+        raise UserError(f'LANG must be one of {tuple(langs)}, not this: {repr(lang)}')
+
+    stages: dict[str, LearningStage] = {w.word.lower(): w.learning_stage for w in words if w.language == lang}
+    known = [word for word, stage in stages.items() if stage == LearningStage.KNOWN]
+
+    lemmas = np.array(index.lemmas, dtype=str)
+    candidates = np.flatnonzero(
+        (np.array(index.languages, dtype=str) == lang) & ~np.isin(np.char.lower(lemmas), known)
+    )
+    totals = index.totals()[candidates]
+    top = candidates[np.argsort(-totals, kind='stable')[: config.LEMMAS_TOP]]
+
+    tsv_lemmas: list[str] = [create_tsv_row('Lemma', 'Count', 'POS', 'Stage')]
+    for lemma, total, pos in zip(lemmas[top], index.totals()[top], index.top_pos()[top]):
+        tsv_lemmas.append(create_tsv_row(lemma, total, pos, stages.get(lemma.lower(), '')))
+    return '\n'.join(tsv_lemmas)
+
+
+def main() -> None:
+    if not config.CACHE_LEMMAS.exists():
+        raise UserError('Lemma index is not found. Import LR files with "polyglotka import" first')
+    print(create_tsv_lemmas(LemmaIndex.load(), words_cache.read([config.LANG])))
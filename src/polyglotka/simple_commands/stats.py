@@ -0,0 +1,70 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Iterable
+
+from polyglotka.common.config import config
+from polyglotka.common.exceptions import UserError
+from polyglotka.importer import rollups, words_cache
+from polyglotka.importer.rollups import Bucket
+from polyglotka.simple_commands.kanji import create_tsv_row
+
+ALL = 'ALL'  # all learning stages
+
+
+def load_rollups() -> Counter[Bucket]:
+    if config.CACHE_ROLLUPS.exists():
+        return rollups.read()
+    if not words_cache.exists():
+        raise UserError('Neither rollups nor cached words are found. Run "polyglotka import" first')
+
+    built = rollups.build(words_cache.read())
+    rollups.write(built)
+    return built
+
+
+def streaks(days: Iterable[date], today: date) -> tuple[int, int]:
+    """Return (current, longest) runs of consecutive days. The current run may end yesterday."""
+    current = longest = run = 0
+    previous: date | None = None
+
+    for day in sorted(days):
+        run = run + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    if previous is not None and previous >= today - timedelta(days=1):
+        current = run
+    return current, longest
+
+
+def create_tsv_stats(rollups_counter: Counter[Bucket], today: date | None = None) -> str:
+    today = today or date.today()
+    since = today - timedelta(days=config.STATS_DAYS - 1)
+
+    grouped: defaultdict[tuple[str, str], Counter[date]] = defaultdict(Counter)
+    for (lang, stage, day), count in rollups_counter.items():
+        if count and config.LANG in (lang, '') and config.STAGE.upper() in (stage, ''):
+            grouped[(lang, stage)][date.fromisoformat(day)] += count
+            grouped[(lang, ALL)][date.fromisoformat(day)] += count
+
+    tsv_stats: list[str] = [
+        create_tsv_row(
+            'Language', 'Stage', 'Total', f'Last {config.STATS_DAYS} Days', 'Current Streak', 'Longest Streak'
+        )
+    ]
+    for (lang, stage), days in sorted(grouped.items()):
+        tsv_stats.append(
+            create_tsv_row(
+                lang,
+                stage,
+                days.total(),
+                sum(count for day, count in days.items() if day >= since),
+                *streaks(days, today),
+            )
+        )
+
+    return '\n'.join(tsv_stats)
+
+
+def main() -> None:
+    print(create_tsv_stats(load_rollups()))
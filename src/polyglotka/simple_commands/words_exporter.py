@@ -1,3 +1,6 @@
+from collections import defaultdict
+from typing import Iterable
+
 import icecream
 from funcy import pluck_attr  # type: ignore
 from path import Path
@@ -5,15 +8,22 @@ from path import Path
 from polyglotka.common.config import config
 from polyglotka.common.console import pprint
 from polyglotka.common.exceptions import UserError
+from polyglotka.common.utils import write_text_atomic
+from polyglotka.importer.search_index import load_search_index
 from polyglotka.importer.words import LearningStage, Word, import_words
+from polyglotka.simple_commands.kanji import create_tsv_row
 
 
 def create_word_list(lang: str = '', stage: str = '', words: set[Word] | None = None) -> list[str]:
     lang = lang or config.LANG
     stage = stage or config.STAGE
-    imported_words: set[Word] = words or import_words()
+    imported_words: set[Word] = words or import_words(langs=[lang])
 
     langs: set[str] = set(pluck_attr('language', imported_words))
+    if not words:  # Only LANG was read, the cache knows the rest
+        from polyglotka.importer import words_cache
+
+        langs.update(words_cache.languages())
     if lang not in langs:
         raise UserError(f'LANG must be one of {tuple(langs)}, not this: {repr(lang)}')
 
@@ -23,14 +33,42 @@ def create_word_list(lang: str = '', stage: str = '', words: set[Word] | None =
     return sorted(word_list)
 
 
+def create_tsv_search(query: str, lang: str = '', stage: str = '') -> str:
+    lang = lang or config.LANG
+    index = load_search_index(lang, import_words(langs=[lang]))
+    matches = index.search(query, stage or config.STAGE, config.QUERY_LIMIT)
+    return '\n'.join(
+        [create_tsv_row('Word', 'Stage', 'Match'), *(create_tsv_row(*match) for match in matches)]
+    )
+
+
 def print_words() -> None:
-    print('\n'.join(create_word_list()))
+    if config.QUERY != '':
+        print(create_tsv_search(str(config.QUERY)))
+    else:
+        print('\n'.join(create_word_list()))
 
 
-def save_anki_known_morphs(lang: str = '', words: set[Word] | None = None) -> None:
-    lang = lang or config.LANG
-    word_list = create_word_list(lang, LearningStage.KNOWN, words)
-    known_morphs_file = Path(config.KNOWN_MORPHS_DIR) / f'{config.APP_NAME}_known_morphs_{lang}.csv'
+def partition_words(words: Iterable[Word]) -> defaultdict[str, defaultdict[LearningStage, list[str]]]:
+    partition: defaultdict[str, defaultdict[LearningStage, list[str]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for word in words:
+        partition[word.language][word.learning_stage].append(word.word)
+    return partition
+
+
+def save_anki_known_morphs(langs: Iterable[str], words: set[Word]) -> None:
+    partition = partition_words(words)
+
+    for lang in langs:
+        if lang not in partition:
+            raise UserError(f'LANG must be one of {tuple(partition)}, not this: {repr(lang)}')
+
+        word_list = sorted(partition[lang][LearningStage.KNOWN])
+        known_morphs_file = Path(config.KNOWN_MORPHS_DIR) / f'{config.APP_NAME}_known_morphs_{lang}.csv'
 
-    known_morphs_file.write_text('Morph-Lemma\n' + '\n'.join(word_list))
-    pprint(f'Saved {len(word_list)} known morphs ({lang}): "{known_morphs_file}".')
+        if write_text_atomic(known_morphs_file, 'Morph-Lemma\n' + '\n'.join(word_list)):
+            pprint(f'Saved {len(word_list)} known morphs ({lang}): "{known_morphs_file}".')
+        else:
+            pprint(f'Known morphs ({lang}) are unchanged: "{known_morphs_file}".')